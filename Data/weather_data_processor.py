@@ -1,12 +1,26 @@
+import argparse
+import glob
+import os
 import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import csv
 
-def create_database():
+# Run from Data/; the project root holds the src package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.DataProcessing.static_data_query import ensure_static_data_schema
+
+STATIC_COLUMNS = ['name', 'temp', 'feels_like', 'humidity', 'description', 'speed', 'dt']
+INSERT_SQL = f"INSERT INTO static_data ({', '.join(STATIC_COLUMNS)}) VALUES ({', '.join('?' * len(STATIC_COLUMNS))})"
+DEFAULT_BATCH_SIZE = 5000
+
+def create_database(db_path='weather_data.db'):
     """Create SQLite database with standardized static_data table"""
-    conn = sqlite3.connect('weather_data.db')
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
     # Drop existing static_data table if it exists
@@ -29,9 +43,16 @@ def create_database():
     conn.commit()
     return conn
 
-def standardize_tobi_data():
+def create_indexes(conn):
+    """
+    Index static_data for per-city lookups and add the completeness_score column
+    (built after the bulk load, which is faster)
+    """
+    ensure_static_data_schema(conn)
+
+def standardize_tobi_data(path='weather_data_Capstone_Tobi.csv'):
     """Process weather_data_Capstone_Tobi.csv"""
-    df = pd.read_csv('weather_data_Capstone_Tobi.csv')
+    df = pd.read_csv(path)
     standardized = pd.DataFrame({
         'name': df['city'],
         'temp': df['temp_f'],
@@ -43,9 +64,9 @@ def standardize_tobi_data():
     })
     return standardized
 
-def standardize_eric_data():
+def standardize_eric_data(path='weather_data_Eric.csv'):
     """Process weather_data_Eric.csv"""
-    df = pd.read_csv('weather_data_Eric.csv')
+    df = pd.read_csv(path)
     standardized = pd.DataFrame({
         'name': df['city'],
         'temp': df['temperature'],
@@ -57,9 +78,9 @@ def standardize_eric_data():
     })
     return standardized
 
-def standardize_shomari_data():
+def standardize_shomari_data(path='weather_data_Shomari.csv'):
     """Process weather_data_Shomari.csv"""
-    df = pd.read_csv('weather_data_Shomari.csv')
+    df = pd.read_csv(path)
     standardized = pd.DataFrame({
         'name': df['City'],
         'temp': df['Temperature (F)'],
@@ -71,9 +92,9 @@ def standardize_shomari_data():
     })
     return standardized
 
-def standardize_dunasha_data():
+def standardize_dunasha_data(path='weather_history_Dunasha.csv'):
     """Process weather_history_Dunasha.csv"""
-    df = pd.read_csv('weather_history_Dunasha.csv', header=None, names=['dt', 'name', 'temp', 'description'])
+    df = pd.read_csv(path, header=None, names=['dt', 'name', 'temp', 'description'])
     standardized = pd.DataFrame({
         'name': df['name'],
         'temp': df['temp'],
@@ -85,9 +106,9 @@ def standardize_dunasha_data():
     })
     return standardized
 
-def standardize_elizabeth_data():
+def standardize_elizabeth_data(path='weather_data_Elizabeth (1).csv'):
     """Process weather_data_Elizabeth.csv (reference format)"""
-    df = pd.read_csv('weather_data_Elizabeth (1).csv')
+    df = pd.read_csv(path)
     standardized = pd.DataFrame({
         'name': df['name'],
         'temp': df['temp'],
@@ -99,43 +120,151 @@ def standardize_elizabeth_data():
     })
     return standardized
 
-def main():
+# Known contributor files and the standardizer that reads each format
+CONTRIBUTOR_FILES = [
+    ("Tobi", 'weather_data_Capstone_Tobi.csv', standardize_tobi_data),
+    ("Eric", 'weather_data_Eric.csv', standardize_eric_data),
+    ("Shomari", 'weather_data_Shomari.csv', standardize_shomari_data),
+    ("Dunasha", 'weather_history_Dunasha.csv', standardize_dunasha_data),
+    ("Elizabeth", 'weather_data_Elizabeth (1).csv', standardize_elizabeth_data),
+]
+
+def standardize_datetimes(data):
+    """Normalize dt to 'YYYY-MM-DD HH:MM:SS' and drop rows whose dt cannot be parsed"""
+    data = data.copy()
+    data['dt'] = pd.to_datetime(data['dt'], errors='coerce')
+    data['dt'] = data['dt'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return data.dropna(subset=['dt'])
+
+def find_ingest_jobs(data_dir='.', extra_patterns=()):
+    """
+    List the CSV files to ingest as (label, path, standardizer) jobs.
+
+    Args:
+        data_dir (str): Directory holding the contributor files in CONTRIBUTOR_FILES
+        extra_patterns (iterable): Glob patterns for more CSVs already in the
+            reference (Elizabeth) column layout
+
+    Returns:
+        list: Jobs for the known files that exist plus every extra match
+    """
+    jobs = []
+    for label, filename, standardizer in CONTRIBUTOR_FILES:
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            jobs.append((label, path, standardizer))
+        else:
+            print(f"[INFO] Skipping {label}'s data: {path} not found")
+    known = {os.path.abspath(path) for _, path, _ in jobs}
+    for pattern in extra_patterns:
+        for path in sorted(glob.glob(pattern)):
+            if os.path.abspath(path) not in known:
+                known.add(os.path.abspath(path))
+                jobs.append((os.path.basename(path), path, standardize_elizabeth_data))
+    return jobs
+
+def load_standardized_rows(job):
+    """
+    Parse and standardize one CSV into insert-ready rows (runs in a worker process).
+
+    Args:
+        job (tuple): (label, path, standardizer) from find_ingest_jobs
+
+    Returns:
+        tuple: (label, rows) where rows is a list of tuples in STATIC_COLUMNS order
+               with plain Python values (None for missing)
+    """
+    label, path, standardizer = job
+    data = standardize_datetimes(standardizer(path))[STATIC_COLUMNS]
+    # Box numpy scalars to Python objects so sqlite3 can bind them
+    data = data.astype(object).where(data.notna(), None)
+    return label, list(data.itertuples(index=False, name=None))
+
+def insert_rows(conn, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert rows into static_data, one transaction per batch_size rows"""
+    for start in range(0, len(rows), batch_size):
+        with conn:
+            conn.executemany(INSERT_SQL, rows[start:start + batch_size])
+    return len(rows)
+
+def ingest_parallel(conn, jobs, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Standardize CSVs in a process pool while this process does all the writing.
+
+    Workers parse and standardize whole files; the calling process is the single
+    SQLite writer and inserts each file's rows as soon as it arrives, in batches.
+    At most two files per worker are in flight, so memory stays bounded however
+    many files there are. Row order across files follows completion order.
+
+    Args:
+        conn (sqlite3.Connection): Connection with an empty static_data table
+        jobs (list): (label, path, standardizer) tuples from find_ingest_jobs
+        workers (int): Pool size (defaults to the number of CPUs)
+        batch_size (int): Rows per insert transaction
+
+    Returns:
+        int: Total rows inserted
+    """
+    workers = workers or os.cpu_count() or 1
+    pending_jobs = list(jobs)
+    total = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        while pending_jobs or in_flight:
+            while pending_jobs and len(in_flight) < workers * 2:
+                in_flight.add(executor.submit(load_standardized_rows, pending_jobs.pop(0)))
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    label, rows = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Failed to standardize a file: {e}")
+                    continue
+                total += insert_rows(conn, rows, batch_size)
+                print(f"[INFO] Inserted {len(rows)} rows from {label}")
+    return total
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static_data table from contributor CSVs")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Standardize files in a process pool with a single batched writer")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --parallel (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per insert transaction for --parallel")
+    parser.add_argument('--data-dir', default='.', help="Directory holding the contributor CSVs")
+    parser.add_argument('--extra', nargs='*', default=[],
+                        help="Glob patterns for more CSVs in the reference column layout")
+    parser.add_argument('--db', default='weather_data.db', help="SQLite database to write")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to process all files and create database"""
+    args = parse_args(argv)
     print("Creating SQLite database...")
-    conn = create_database()
-    
-    datasets = []
-    
-    print("Processing Tobi's data...")
-    tobi_data = standardize_tobi_data()
-    datasets.append(tobi_data)
-    
-    print("Processing Eric's data...")
-    eric_data = standardize_eric_data()
-    datasets.append(eric_data)
-    
-    print("Processing Shomari's data...")
-    shomari_data = standardize_shomari_data()
-    datasets.append(shomari_data)
-    
-    print("Processing Dunasha's data...")
-    dunasha_data = standardize_dunasha_data()
-    datasets.append(dunasha_data)
-    
-    print("Processing Elizabeth's data...")
-    elizabeth_data = standardize_elizabeth_data()
-    datasets.append(elizabeth_data)
-    
-    print("Combining all datasets...")
-    combined_data = pd.concat(datasets, ignore_index=True)
+    conn = create_database(args.db)
+    jobs = find_ingest_jobs(args.data_dir, args.extra)
     
-    print("Standardizing datetime formats...")
-    combined_data['dt'] = pd.to_datetime(combined_data['dt'], errors='coerce')
-    combined_data['dt'] = combined_data['dt'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    combined_data = combined_data.dropna(subset=['dt'])
+    if args.parallel:
+        print(f"Processing {len(jobs)} files in parallel...")
+        started = time.perf_counter()
+        inserted = ingest_parallel(conn, jobs, args.workers, args.batch_size)
+        print(f"[INFO] Inserted {inserted} rows in {time.perf_counter() - started:.2f}s")
+    else:
+        datasets = []
+        for label, path, standardizer in jobs:
+            print(f"Processing {label}'s data...")
+            # Parse dt per file: each contributor uses its own timestamp format
+            datasets.append(standardize_datetimes(standardizer(path)))
+        
+        print("Combining all datasets...")
+        combined_data = pd.concat(datasets, ignore_index=True)
+        
+        print("Inserting data into static_data table...")
+        combined_data.to_sql('static_data', conn, if_exists='append', index=False)
     
-    print("Inserting data into static_data table...")
-    combined_data.to_sql('static_data', conn, if_exists='append', index=False)
+    print("Creating indexes...")
+    create_indexes(conn)
     
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM static_data")
@@ -162,7 +291,7 @@ def main():
         print(f"  {row}")
     
     conn.close()
-    print(f"\nDatabase saved as 'weather_data.db'")
+    print(f"\nDatabase saved as '{args.db}'")
 
 if __name__ == "__main__":
 
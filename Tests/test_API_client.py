@@ -0,0 +1,296 @@
+import unittest
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import requests
+
+from src.API.API_call import WeatherAPI
+from src.API.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+CITY_BY_ID = {}
+
+
+def fake_payload(city):
+    city_id = abs(hash(city)) % 100000 + 1
+    CITY_BY_ID[city_id] = city
+    return {
+        "id": city_id,
+        "name": city,
+        "main": {"temp": 70.0, "feels_like": 71.0, "humidity": 50},
+        "weather": [{"description": "clear sky"}],
+        "wind": {"speed": 4.0},
+        "dt": 1720000000,
+    }
+
+
+def requested_city(params):
+    """City a mocked request asked for, by name or (once known to the gazetteer) by ID"""
+    return params["q"] if "q" in params else CITY_BY_ID[params["id"]]
+
+
+def fake_response(city, status=200):
+    response = mock.Mock()
+    response.status_code = status
+    response.headers = {}
+    response.json.return_value = fake_payload(city)
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(f"{status} error", response=response)
+    else:
+        response.raise_for_status.return_value = None
+    return response
+
+
+class TestWeatherAPIBatch(unittest.TestCase):
+    def setUp(self):
+        self.api = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", calls_per_minute=0)
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_results_keep_input_order_and_report_errors(self):
+        def fake_get(url, params=None, timeout=None):
+            if requested_city(params) == "Nowhere":
+                return fake_response("Nowhere", status=404)
+            return fake_response(requested_city(params))
+
+        with mock.patch.object(self.api.session, "get", side_effect=fake_get):
+            results = self.api.get_weather_data_many(["Boston", "Nowhere", "Miami"])
+
+        self.assertEqual([r["city"] for r in results], ["Boston", "Nowhere", "Miami"])
+        self.assertEqual(results[0]["data"]["name"], "Boston")
+        self.assertIsNone(results[0]["error"])
+        self.assertIsNone(results[1]["data"])
+        self.assertIsInstance(results[1]["error"], requests.exceptions.HTTPError)
+        self.assertEqual(results[2]["data"]["name"], "Miami")
+
+    def test_in_flight_requests_are_capped(self):
+        lock = threading.Lock()
+        state = {"current": 0, "peak": 0}
+
+        def slow_get(url, params=None, timeout=None):
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.02)
+            with lock:
+                state["current"] -= 1
+            return fake_response(requested_city(params))
+
+        cities = [f"City{i}" for i in range(12)]
+        with mock.patch.object(self.api.session, "get", side_effect=slow_get):
+            results = self.api.get_weather_data_many(cities, max_workers=3)
+
+        self.assertEqual(len(results), 12)
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_concurrent_lookups_for_one_city_share_a_request(self):
+        release = threading.Event()
+
+        def slow_get(url, params=None, timeout=None):
+            release.wait(1)
+            return fake_response(requested_city(params))
+
+        results = []
+        with mock.patch.object(self.api.session, "get", side_effect=slow_get) as get:
+            threads = [threading.Thread(target=lambda c=city: results.append(self.api.get_weather_data(c)))
+                       for city in ["Boston", "boston", " BOSTON ", "Boston", "Miami"]]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.api.coalescing_stats()["shared"], 3)
+
+
+class TestWeatherAPIGroupEndpoint(unittest.TestCase):
+    def setUp(self):
+        # No cache, so every lookup has to reach the (mocked) API
+        self.api = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", calls_per_minute=0, cache_ttl=0)
+        self.cities = [f"City{chr(65 + i // 26)}{chr(65 + i % 26)}" for i in range(25)]
+
+    def tearDown(self):
+        self.api.close()
+
+    def fake_get(self, url, params=None, timeout=None):
+        if url == self.api.group_url:
+            ids = [int(i) for i in params["id"].split(",")]
+            response = mock.Mock(status_code=200, headers={})
+            response.json.return_value = {"cnt": len(ids), "list": [fake_payload(CITY_BY_ID[i]) for i in ids]}
+            return response
+        return fake_response(requested_city(params))
+
+    def test_known_ids_are_fetched_twenty_per_request(self):
+        with mock.patch.object(self.api.session, "get", side_effect=self.fake_get) as get:
+            first = self.api.get_weather_data_bulk(self.cities)  # learns IDs one city at a time
+            self.assertEqual(get.call_count, 25)
+
+            second = self.api.get_weather_data_bulk(self.cities)
+            self.assertEqual(get.call_count, 25 + 2)
+            group_calls = [c for c in get.call_args_list if c.args[0] == self.api.group_url]
+            self.assertEqual(len(group_calls), 2)
+
+        self.assertEqual([r["data"]["name"] for r in first], self.cities)
+        self.assertEqual([r["data"]["name"] for r in second], self.cities)
+        self.assertTrue(all(r["error"] is None for r in second))
+        self.assertIn("_unit_info", second[0]["data"])
+
+    def test_group_failure_is_reported_per_city(self):
+        for city in self.cities[:3]:
+            self.api.gazetteer.record(city, fake_payload(city))
+        with mock.patch.object(self.api.session, "get", return_value=fake_response("x", 401)):
+            results = self.api.get_weather_data_bulk(self.cities[:3])
+        self.assertTrue(all(isinstance(r["error"], requests.exceptions.HTTPError) for r in results))
+
+
+class TestWeatherAPIGazetteer(unittest.TestCase):
+    def setUp(self):
+        self.api = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", calls_per_minute=0, cache_ttl=0)
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_known_city_is_requested_by_id(self):
+        payload = dict(fake_payload("New York"), coord={"lat": 40.71, "lon": -74.01}, sys={"country": "US"})
+        response = fake_response("New York")
+        response.json.return_value = payload
+        with mock.patch.object(self.api.session, "get", return_value=response) as get:
+            self.api.get_weather_data("nyc")
+            self.api.get_weather_data("New York")
+
+        self.assertEqual(get.call_args_list[0].kwargs["params"]["q"], "nyc")
+        self.assertEqual(get.call_args_list[1].kwargs["params"]["id"], payload["id"])
+        self.assertEqual(self.api.gazetteer.lookup_id(payload["id"])["country"], "US")
+        self.assertEqual(self.api.gazetteer.nearest(40.7, -74.0)["name"], "New York")
+
+    def test_qualified_query_does_not_take_over_bare_name(self):
+        responses = {}
+        for city, city_id, country in [("London,CA", 6058560, "CA"), ("London", 2643743, "GB")]:
+            response = fake_response("London")
+            response.json.return_value = dict(fake_payload("London"), id=city_id, sys={"country": country})
+            responses[city] = response
+        with mock.patch.object(self.api.session, "get", side_effect=lambda url, params=None, timeout=None: responses[params["q"]]) as get:
+            self.api.get_weather_data("London,CA")
+            data = self.api.get_weather_data("London")
+
+        self.assertEqual(get.call_args_list[1].kwargs["params"]["q"], "London")
+        self.assertEqual(data["sys"]["country"], "GB")
+        self.assertEqual(self.api.gazetteer.lookup("London")["city_id"], 2643743)
+        self.assertEqual(self.api.gazetteer.lookup("London,CA")["city_id"], 6058560)
+
+    def test_unknown_city_is_rejected_locally_after_404(self):
+        with mock.patch.object(self.api.session, "get", return_value=fake_response("Atlantis", 404)) as get:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.api.get_weather_data("Atlantis")
+            with self.assertRaises(ValueError):
+                self.api.get_weather_data("atlantis")
+        self.assertEqual(get.call_count, 1)
+
+
+class TestWeatherAPICache(unittest.TestCase):
+    def setUp(self):
+        self.api = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", cache_ttl=600, cache_size=2)
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        with mock.patch.object(self.api.session, "get", return_value=fake_response("Boston")) as get:
+            first = self.api.get_weather_data("boston ")
+            second = self.api.get_weather_data("Boston")
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(first, second)
+        stats = self.api.cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_expired_and_evicted_entries_are_refetched(self):
+        with mock.patch.object(self.api.session, "get", side_effect=lambda url, params=None, timeout=None: fake_response(requested_city(params))) as get:
+            for city in ["Boston", "Miami", "Denver"]:
+                self.api.get_weather_data(city)
+            self.api.get_weather_data("Boston")  # evicted by Denver (size bound of 2)
+            self.assertEqual(get.call_count, 4)
+
+            with mock.patch("src.API.response_cache.time.time", return_value=time.time() + 601):
+                self.api.get_weather_data("Denver")  # expired
+            self.assertEqual(get.call_count, 5)
+
+    def test_cache_persists_across_instances(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "cache.json")
+        api = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", cache_path=path)
+        self.addCleanup(api.close)
+        with mock.patch.object(api.session, "get", return_value=fake_response("Boston")):
+            api.get_weather_data("Boston")
+        api.close()
+
+        restarted = WeatherAPI(api_key="test-key", gazetteer_path=":memory:", cache_path=path)
+        self.addCleanup(restarted.close)
+        with mock.patch.object(restarted.session, "get") as get:
+            data = restarted.get_weather_data("Boston")
+        get.assert_not_called()
+        self.assertEqual(data["name"], "Boston")
+        restarted.close()
+
+
+class TestWeatherAPIResilience(unittest.TestCase):
+    def setUp(self):
+        self.api = WeatherAPI(
+            api_key="test-key",
+            gazetteer_path=":memory:",
+            calls_per_minute=0,
+            retry_policy=RetryPolicy(max_retries=2, base_delay=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+
+    def tearDown(self):
+        self.api.close()
+
+    def test_transient_errors_are_retried(self):
+        responses = [fake_response("Boston", 503), fake_response("Boston", 502), fake_response("Boston")]
+        with mock.patch.object(self.api.session, "get", side_effect=responses) as get:
+            data = self.api.get_weather_data("Boston")
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(data["name"], "Boston")
+
+    def test_client_errors_are_not_retried(self):
+        with mock.patch.object(self.api.session, "get", return_value=fake_response("Nowhere", 404)) as get:
+            with self.assertRaises(requests.exceptions.HTTPError):
+                self.api.get_weather_data("Nowhere")
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(self.api.health_status()["state"], CircuitBreaker.CLOSED)
+
+    def test_breaker_opens_and_fails_fast(self):
+        with mock.patch.object(self.api.session, "get", side_effect=requests.exceptions.Timeout("slow")) as get:
+            for city in ["Boston", "Miami"]:
+                with self.assertRaises(requests.exceptions.Timeout):
+                    self.api.get_weather_data(city)
+            self.assertEqual(get.call_count, 6)
+
+            with self.assertRaises(CircuitOpenError):
+                self.api.get_weather_data("Denver")
+            self.assertEqual(get.call_count, 6)
+        self.assertEqual(self.api.health_status()["state"], CircuitBreaker.OPEN)
+
+    def test_stale_cache_is_served_during_outage(self):
+        with mock.patch.object(self.api.session, "get", return_value=fake_response("Boston")):
+            self.api.get_weather_data("Boston")
+
+        with mock.patch("src.API.response_cache.time.time", return_value=time.time() + 3600), \
+                mock.patch.object(self.api.session, "get", side_effect=requests.exceptions.ConnectionError("down")):
+            data = self.api.get_weather_data("Boston")
+        self.assertTrue(data["_stale"])
+        self.assertEqual(data["name"], "Boston")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.DataProcessing.comparison_matrix import build_matrix, field_colors, format_column
+
+
+def make_records(rows):
+    df = pd.DataFrame(rows, columns=['name', 'temp', 'feels_like', 'humidity', 'description', 'speed', 'dt'])
+    return df.set_index('name', drop=False)
+
+
+class TestFieldColors(unittest.TestCase):
+    def test_two_cities_match_pairwise_colouring(self):
+        values = pd.Series([80.0, 70.0])
+        self.assertEqual(list(field_colors(values, 'temp')), ["red", "blue"])
+        self.assertEqual(list(field_colors(values, 'speed')), ["orange", "green"])
+        self.assertEqual(list(field_colors(pd.Series([5.0, 5.0]), 'temp')), ["white", "white"])
+        self.assertEqual(list(field_colors(pd.Series([5.0, np.nan]), 'temp')), ["gray", "gray"])
+        self.assertEqual(list(field_colors(pd.Series(["clear", "rain"]), 'description')), ["white", "white"])
+
+    def test_many_cities_colour_extremes_only(self):
+        values = pd.Series([70.0, 90.0, np.nan, 60.0, 90.0, 75.0])
+        self.assertEqual(list(field_colors(values, 'feels_like')),
+                         ["white", "red", "gray", "blue", "red", "white"])
+
+
+class TestBuildMatrix(unittest.TestCase):
+    def setUp(self):
+        self.records = make_records([
+            ("Miami", 88.0, 95.0, 70, "clear", 8.0, "2024-07-01 00:00:00"),
+            ("Tampa", 90.0, None, 65, "rain", 12.5, "2024-07-01 00:00:00"),
+            ("Nowhere", None, None, None, None, None, None),
+            ("Orlando", 85.0, 90.0, 60, "clouds", 5.0, "2024-07-02 00:00:00"),
+        ])
+
+    def test_sorted_and_ranked_by_field(self):
+        matrix = build_matrix(self.records, "°F", sort_by='temp')
+        self.assertEqual(list(matrix.text.index), ["Tampa", "Miami", "Orlando", "Nowhere"])
+        self.assertEqual(matrix.ranks['temp'].tolist()[:3], [1.0, 2.0, 3.0])
+        self.assertTrue(np.isnan(matrix.ranks['temp'].iloc[3]))
+        self.assertTrue(matrix.ranks['description'].isna().all())
+        self.assertEqual(list(matrix.colors['temp']), ["red", "white", "blue", "gray"])
+        self.assertEqual(list(matrix.colors['speed']), ["orange", "white", "green", "gray"])
+
+    def test_frames_are_aligned_and_formatted(self):
+        matrix = build_matrix(self.records, "°C")
+        self.assertEqual(matrix.text.shape, matrix.colors.shape)
+        self.assertEqual(list(matrix.text.columns), list(matrix.ranks.columns))
+        self.assertEqual(matrix.text.loc["Miami"].tolist(),
+                         ["88.0°C", "95.0°C", "70%", "clear", "8.0 mph", "2024-07-01 00:00:00"])
+        self.assertTrue((matrix.text.loc["Nowhere"] == "N/A").all())
+
+    def test_format_column_handles_missing_values(self):
+        self.assertEqual(format_column(pd.Series([1.25, None]), 'speed', "°F").tolist(), ["1.2 mph", "N/A"])
+        self.assertEqual(format_column(pd.Series(["x", None]), 'dt', "°F").tolist(), ["x", "N/A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
 import unittest
 import os
 import sqlite3
+import tempfile
+import queue
+import threading
+import time
+from unittest import mock
+from src.DataProcessing import migrations, sqlite_profile
+from src.DataProcessing.data_query import WeatherRecord, fetch_last_data_entry, fetch_most_recent_entry, records_to_dataframe
 from src.DataProcessing.data_to_SQL import WeatherDB
+from src.DataProcessing.write_behind import WriteBehindQueue
 
 # class TestWeatherDB(unittest.TestCase):
 #     def setUp(self):
@@ -33,3 +41,605 @@ from src.DataProcessing.data_to_SQL import WeatherDB
 
 # if __name__ == '__main__':
 #     unittest.main()
+
+
+def make_owm_payload(name, dt=1720000000, temp=20.5):
+    return {
+        "name": name,
+        "main": {"temp": temp, "feels_like": 21.0, "humidity": 60},
+        "weather": [{"description": "clear sky"}],
+        "wind": {"speed": 3.4},
+        "dt": dt,
+    }
+
+
+class WeatherDBTestCase(unittest.TestCase):
+    """Creates a throwaway WeatherDB per test"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
+        self.db_path = os.path.join(self.tmp_dir, "test_weather.db")
+        self.db = WeatherDB(self.db_path)
+        # Tests may swap in another instance; close whichever is current before the directory goes
+        self.addCleanup(lambda: self.db.close())
+
+    def count_rows(self, where="1=1", params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM weather WHERE {where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+
+class TestWeatherDBConnection(WeatherDBTestCase):
+    def test_save_reuses_one_connection(self):
+        conn = self.db._conn
+        self.db.save(make_owm_payload("TestCity"))
+        self.db.save(make_owm_payload("OtherCity"))
+        self.assertIs(self.db._conn, conn)
+        self.assertEqual(self.count_rows("name = ?", ("TestCity",)), 1)
+
+    def test_save_from_worker_threads(self):
+        threads = [threading.Thread(target=self.db.save, args=(make_owm_payload(f"City{i}", dt=1720000000 + i),))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.count_rows(), 8)
+
+
+class TestWeatherDBBatch(WeatherDBTestCase):
+    def count_commits(self, action):
+        statements = []
+        self.db._conn.set_trace_callback(statements.append)
+        try:
+            result = action()
+        finally:
+            self.db._conn.set_trace_callback(None)
+        return result, sum(1 for sql in statements if sql.strip().upper() == "COMMIT")
+
+    def test_save_many_inserts_in_one_transaction(self):
+        records = [make_owm_payload(f"City{i}", dt=1720000000 + i) for i in range(50)]
+        saved, commits = self.count_commits(lambda: self.db.save_many(records))
+        self.assertEqual(saved, 50)
+        self.assertEqual(commits, 1)
+        self.assertEqual(self.count_rows(), 50)
+
+    def test_save_many_skips_invalid_and_honours_chunk_size(self):
+        records = [make_owm_payload(f"City{i}", dt=1720000000 + i) for i in range(5)]
+        records.insert(2, {"name": "Broken", "main": {}})
+        saved, commits = self.count_commits(lambda: self.db.save_many(records, chunk_size=2))
+        self.assertEqual(saved, 5)
+        self.assertEqual(commits, 3)
+        self.assertEqual(self.count_rows(), 5)
+
+
+class TestWeatherDBEpoch(WeatherDBTestCase):
+    def test_save_stores_text_and_epoch_time(self):
+        self.db.save(make_owm_payload("TestCity", dt=1720000000))
+        conn = sqlite3.connect(self.db_path)
+        dt, dt_epoch = conn.execute("SELECT dt, dt_epoch FROM weather").fetchone()
+        conn.close()
+        self.assertEqual(dt, "2024-07-03 09:46:40")
+        self.assertEqual(dt_epoch, 1720000000)
+
+    def test_legacy_text_table_is_backfilled(self):
+        legacy_path = os.path.join(self.tmp_dir, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("""
+            CREATE TABLE weather (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, temp REAL, feels_like REAL,
+                humidity INTEGER, description TEXT, speed REAL, dt TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO weather (name, temp, humidity, description, speed, dt) VALUES (?, 70, 50, 'clear', 3, ?)",
+            [(f"City{i}", f"2025-07-10 00:{i:02d}:00") for i in range(12)],
+        )
+        conn.commit()
+        conn.close()
+
+        db = WeatherDB(legacy_path)
+        self.assertTrue(db.wait_for_migrations(5))
+        db.close()
+
+        conn = sqlite3.connect(legacy_path)
+        rows = conn.execute("SELECT dt_epoch FROM weather ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual(rows[0][0], 1752105600)
+        self.assertEqual(rows[11][0], 1752105600 + 11 * 60)
+
+
+
+class TestWeatherDBUpsert(WeatherDBTestCase):
+    def test_refetched_observation_updates_existing_row(self):
+        self.db.save(make_owm_payload("Miami", dt=1720000000, temp=80.0))
+        self.db.save(make_owm_payload("Miami", dt=1720000000, temp=81.5))
+        self.db.save_many([make_owm_payload("Miami", dt=1720000000, temp=82.0),
+                           make_owm_payload("Miami", dt=1720000600, temp=83.0)])
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT dt_epoch, temp FROM weather ORDER BY dt_epoch").fetchall()
+        conn.close()
+        self.assertEqual(rows, [(1720000000, 82.0), (1720000600, 83.0)])
+
+    def test_existing_duplicates_are_compacted_on_upgrade(self):
+        path = os.path.join(self.tmp_dir, "duplicates.db")
+        conn = sqlite3.connect(path)
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather"))
+        conn.executemany(
+            "INSERT INTO weather (name, temp, humidity, description, speed, dt, dt_epoch) VALUES (?, ?, 50, 'clear', 3, '', ?)",
+            [("Miami", 80.0, 100), ("Miami", 81.0, 100), ("Tampa", 75.0, 100), ("Miami", 82.0, 100), ("Miami", 84.0, 200)],
+        )
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        messages = []
+        migrations.migrate(conn, chunk_size=2, progress=messages.append)
+        rows = conn.execute("SELECT name, temp, dt_epoch FROM weather ORDER BY name, dt_epoch").fetchall()
+        conn.close()
+
+        self.assertEqual(rows, [("Miami", 82.0, 100), ("Miami", 84.0, 200), ("Tampa", 75.0, 100)])
+        self.assertIn("Compacted weather rows up to id 5: 2 duplicates removed...", messages)
+        conn = sqlite3.connect(path)
+        with self.assertRaises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO weather (name, dt_epoch) VALUES ('Tampa', 100)")
+        conn.close()
+
+
+class TestLatestWeather(WeatherDBTestCase):
+    def latest(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT name, temp, dt_epoch FROM latest_weather ORDER BY name").fetchall()
+        conn.close()
+        return rows
+
+    def test_writes_keep_newest_row_per_city(self):
+        self.db.save(make_owm_payload("Miami", dt=1720000600, temp=80.0))
+        self.db.save_many([make_owm_payload("Miami", dt=1720000000, temp=70.0),  # older, ignored
+                           make_owm_payload("Tampa", dt=1720000000, temp=75.0)])
+        self.db.save(make_owm_payload("Miami", dt=1720000600, temp=81.0))        # upsert of newest
+        self.assertEqual(self.latest(), [("Miami", 81.0, 1720000600), ("Tampa", 75.0, 1720000000)])
+
+        with self.db._conn:
+            self.db._conn.execute("DELETE FROM weather WHERE name = 'Miami' AND dt_epoch = 1720000600")
+        self.assertEqual(self.latest(), [("Miami", 70.0, 1720000000), ("Tampa", 75.0, 1720000000)])
+
+    def test_existing_history_is_seeded_on_upgrade(self):
+        path = os.path.join(self.tmp_dir, "history.db")
+        conn = sqlite3.connect(path)
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather"))
+        conn.executemany(
+            "INSERT INTO weather (name, temp, dt, dt_epoch) VALUES (?, ?, '', ?)",
+            [("Miami", 80.0, 300), ("Miami", 81.0, 100), ("Tampa", 75.0, 200)],
+        )
+        conn.execute("PRAGMA user_version = 4")
+        conn.commit()
+        migrations.migrate(conn, progress=lambda message: None)
+        rows = conn.execute("SELECT name, temp FROM latest_weather ORDER BY name").fetchall()
+        conn.close()
+        self.assertEqual(rows, [("Miami", 80.0), ("Tampa", 75.0)])
+
+    def test_queries_read_latest_weather(self):
+        self.db.save(make_owm_payload("Miami", dt=1720000000, temp=80.0))
+        self.db.save(make_owm_payload("Miami", dt=1720000600, temp=82.0))
+        self.db.save(make_owm_payload("Tampa", dt=1720000300, temp=75.0))
+
+        row = fetch_last_data_entry("Miami", self.db_path)
+        self.assertIsInstance(row, WeatherRecord)
+        self.assertEqual((row.temp, row["dt"], row.get("dt_epoch")), (82.0, "2024-07-03 09:56:40", 1720000600))
+        self.assertEqual(fetch_most_recent_entry(self.db_path)["name"], "Miami")
+        self.assertIsNone(fetch_last_data_entry("Nowhere", self.db_path))
+
+    def test_queries_fall_back_to_history_before_migration(self):
+        path = os.path.join(self.tmp_dir, "unmigrated.db")
+        conn = sqlite3.connect(path)
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather"))
+        conn.execute("INSERT INTO weather (name, temp, dt, dt_epoch) VALUES ('Miami', 80.0, '', 100)")
+        conn.commit()
+        conn.close()
+        self.assertEqual(fetch_last_data_entry("Miami", path)["temp"], 80.0)
+        self.assertEqual(fetch_most_recent_entry(path)["name"], "Miami")
+
+
+class TestLatestReadCache(WeatherDBTestCase):
+    def count_queries(self, action):
+        statements = []
+        self.db._conn.set_trace_callback(statements.append)
+        try:
+            result = action()
+        finally:
+            self.db._conn.set_trace_callback(None)
+        return result, sum(1 for sql in statements if "latest_weather" in sql)
+
+    def test_repeated_reads_are_served_from_memory(self):
+        self.db.save(make_owm_payload("Miami", temp=80.0))
+        first, queries = self.count_queries(lambda: [self.db.get_latest("Miami") for _ in range(5)])
+        self.assertEqual(queries, 1)
+        self.assertEqual(first[-1].temp, 80.0)
+        missing, queries = self.count_queries(lambda: [self.db.get_latest("Nowhere") for _ in range(3)])
+        self.assertEqual((missing[-1], queries), (None, 1))
+        stats = self.db.latest_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (6, 2))
+
+    def test_writes_invalidate_cached_city(self):
+        self.db.save(make_owm_payload("Miami", dt=1720000000, temp=80.0))
+        self.db.save(make_owm_payload("Tampa", dt=1720000000, temp=75.0))
+        self.assertEqual(self.db.get_latest("Miami").temp, 80.0)
+        self.assertEqual(self.db.get_latest("Tampa").temp, 75.0)
+        self.assertEqual(self.db.get_most_recent().name, "Tampa")
+
+        self.db.save_many([make_owm_payload("Miami", dt=1720000600, temp=82.0)])
+        self.assertEqual(self.db.get_latest("Miami").temp, 82.0)
+        self.assertEqual(self.db.get_most_recent().name, "Miami")
+        _, queries = self.count_queries(lambda: self.db.get_latest("Tampa"))
+        self.assertEqual(queries, 0)
+
+        self.db.enqueue(make_owm_payload("Tampa", dt=1720001200, temp=77.0))
+        self.db.flush(timeout=5)
+        self.assertEqual(self.db.get_latest("Tampa").temp, 77.0)
+
+    def test_writes_from_other_connections_are_seen(self):
+        self.db.save(make_owm_payload("Miami", dt=1720000000, temp=80.0))
+        self.assertEqual(self.db.get_latest("Miami").temp, 80.0)
+        self.assertIsNone(self.db.get_latest("Tampa"))  # cached "no data"
+
+        other = WeatherDB(self.db_path)
+        other.save_many([make_owm_payload("Miami", dt=1720000600, temp=82.0),
+                         make_owm_payload("Tampa", dt=1720000600, temp=75.0)])
+        other.close()
+
+        self.assertEqual(self.db.get_latest("Miami").temp, 82.0)
+        self.assertEqual(self.db.get_latest("Tampa").temp, 75.0)
+        _, queries = self.count_queries(lambda: self.db.get_latest("Tampa"))
+        self.assertEqual(queries, 0)
+
+    def test_cache_is_bounded(self):
+        db = WeatherDB(os.path.join(self.tmp_dir, "small.db"), latest_cache_size=2)
+        for city in ("A", "B", "C"):
+            db.get_latest(city)
+        stats = db.latest_cache.stats()
+        db.close()
+        self.assertEqual((stats['size'], stats['evictions']), (2, 1))
+
+
+class TestWeatherRecord(unittest.TestCase):
+    def setUp(self):
+        self.record = WeatherRecord(1, "Miami", 80.0, None, 60, "clear sky", 3.4, "2024-07-03 09:46:40", 1720000000)
+
+    def test_lookup_styles(self):
+        self.assertEqual(self.record.name, "Miami")
+        self.assertEqual(self.record["speed"], 3.4)
+        self.assertEqual(self.record[2], 80.0)
+        self.assertIsNone(self.record.get("feels_like", "unused"))
+        self.assertEqual(self.record.get("missing", "default"), "default")
+        self.assertEqual(self.record.get("count", "default"), "default")
+        with self.assertRaises(KeyError):
+            self.record["missing"]
+
+    def test_records_to_dataframe(self):
+        df = records_to_dataframe([self.record, self.record._replace(name="Tampa")])
+        self.assertEqual(list(df.columns), list(WeatherRecord._fields))
+        self.assertEqual(df["name"].tolist(), ["Miami", "Tampa"])
+
+
+class TestWriteBehind(WeatherDBTestCase):
+    def test_enqueued_records_are_written_in_batches(self):
+        for i in range(25):
+            self.db.enqueue(make_owm_payload(f"City{i}", dt=1720000000 + i))
+        self.assertTrue(self.db.flush(timeout=5))
+        self.assertEqual(self.count_rows(), 25)
+        stats = self.db.writer_stats()
+        self.assertEqual((stats['written'], stats['failed'], stats['pending']), (25, 0, 0))
+        self.assertLessEqual(stats['batches'], 25)
+
+    def test_close_flushes_queued_records(self):
+        self.db.enqueue(make_owm_payload("Miami"))
+        self.db.enqueue({"name": "Broken", "main": {}})
+        self.db.close()
+        self.db = WeatherDB(self.db_path)
+        self.assertEqual(self.count_rows(), 1)
+
+    def test_enqueue_after_close_raises(self):
+        self.db.close()
+        with self.assertRaises(RuntimeError):
+            self.db.enqueue(make_owm_payload("Miami"))
+        self.assertIsNone(self.db._writer)
+
+    def test_full_queue_applies_backpressure(self):
+        release = threading.Event()
+        batches = []
+
+        def slow_write(batch):
+            release.wait(5)
+            batches.append(batch)
+
+        writer = WriteBehindQueue(slow_write, max_size=2, batch_size=10)
+        writer.put("a")
+        time.sleep(0.05)  # writer picks up "a" and blocks in slow_write
+        writer.put("b")
+        writer.put("c")
+        with self.assertRaises(queue.Full):
+            writer.put("d", timeout=0.05)
+        self.assertEqual(writer.stats()['blocked_puts'], 1)
+
+        release.set()
+        self.assertTrue(writer.close(timeout=5))
+        self.assertEqual(batches, [["a"], ["b", "c"]])
+        self.assertEqual(writer.stats()['written'], 3)
+
+    def test_put_racing_close_is_rejected_not_dropped(self):
+        written = []
+        writer = WriteBehindQueue(written.extend)
+        resume = threading.Event()
+        idle = writer._idle
+
+        class PauseProducer:
+            """Stalls the producer's first lock acquisition until close() has finished"""
+            paused = False
+
+            def __enter__(inner):
+                if threading.current_thread().name == "producer" and not inner.paused:
+                    inner.paused = True
+                    resume.wait(5)
+                return idle.__enter__()
+
+            def __exit__(inner, *exc):
+                return idle.__exit__(*exc)
+
+            def __getattr__(inner, name):
+                return getattr(idle, name)
+
+        writer._idle = PauseProducer()
+        errors = []
+
+        def producer():
+            try:
+                writer.put("late")
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=producer, name="producer")
+        thread.start()
+        time.sleep(0.05)  # producer is inside put(), waiting on the lock
+        self.assertTrue(writer.close(timeout=5))
+        resume.set()
+        thread.join(5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(written, [])
+        self.assertEqual(writer.pending(), 0)
+
+    def test_enqueue_racing_close_does_not_crash(self):
+        self.db.enqueue(make_owm_payload("Miami"))
+        original = self.db._writer_lock
+
+        class CloseOnRelease:
+            """Runs close() in the window after enqueue() releases the writer lock"""
+            def __enter__(inner):
+                return original.__enter__()
+
+            def __exit__(inner, *exc):
+                original.__exit__(*exc)
+                self.db._writer_lock = original
+                self.db.close()
+
+        self.db._writer_lock = CloseOnRelease()
+        with self.assertRaises(RuntimeError):  # the closed queue rejects it, no AttributeError
+            self.db.enqueue(make_owm_payload("Tampa"))
+
+
+class TestSchemaMigrations(WeatherDBTestCase):
+    def test_new_database_is_stamped_with_latest_version(self):
+        self.assertEqual(migrations.get_version(self.db._conn), migrations.WEATHER_MIGRATIONS[-1].version)
+
+    def test_up_to_date_database_only_reads_user_version(self):
+        self.db.close()
+        conn = sqlite3.connect(self.db_path)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        migrations.migrate(conn)
+        conn.close()
+        self.assertEqual(statements, ["PRAGMA user_version"])
+        self.db = WeatherDB(self.db_path)
+
+    def test_reordered_table_is_copied_in_resumable_batches(self):
+        path = os.path.join(self.tmp_dir, "reordered.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE weather (id INTEGER PRIMARY KEY, dt TEXT, name TEXT, temp REAL, humidity INTEGER, description TEXT, speed REAL)")
+        conn.executemany(
+            "INSERT INTO weather (id, dt, name, temp, humidity, description, speed) VALUES (?, ?, ?, 70, 50, 'clear', 3)",
+            [(i, f"2025-07-10 00:{i:02d}:00", f"City{i}") for i in range(1, 11)],
+        )
+        # Simulate a run that stopped after copying the first three rows
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather_new"))
+        conn.execute("INSERT INTO weather_new (id, name, dt) SELECT id, name, dt FROM weather WHERE id <= 3")
+        conn.commit()
+
+        messages = []
+        version = migrations.migrate(conn, chunk_size=4, progress=messages.append)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(weather)")]
+        rows = conn.execute("SELECT id, name, dt_epoch FROM weather ORDER BY id").fetchall()
+        leftovers = conn.execute("SELECT name FROM sqlite_master WHERE name = 'weather_new'").fetchall()
+        conn.close()
+
+        self.assertEqual(version, migrations.WEATHER_MIGRATIONS[-1].version)
+        self.assertEqual(columns, WeatherDB.COLUMNS)
+        self.assertEqual([row[0] for row in rows], list(range(1, 11)))
+        self.assertEqual(rows[9], (10, "City10", 1752105600 + 10 * 60))
+        self.assertEqual(leftovers, [])
+        self.assertIn("Copied 7/10 rows from weather to weather_new...", messages)
+
+    def test_interrupted_rename_keeps_copied_rows(self):
+        # Earlier releases committed DROP and RENAME separately; a stop in between
+        # left only weather_new
+        path = os.path.join(self.tmp_dir, "renamed.db")
+        conn = sqlite3.connect(path)
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather_new"))
+        conn.executemany(
+            "INSERT INTO weather_new (id, name, temp, dt) VALUES (?, ?, 70, ?)",
+            [(i, f"City{i}", f"2025-07-10 00:{i:02d}:00") for i in range(1, 6)],
+        )
+        conn.commit()
+        conn.close()
+
+        db = WeatherDB(path)
+        try:
+            self.assertTrue(db.wait_for_migrations(5))
+            self.assertEqual(migrations.get_version(db._conn), migrations.WEATHER_MIGRATIONS[-1].version)
+            self.assertEqual(db._conn.execute("SELECT COUNT(*) FROM weather").fetchone()[0], 5)
+            self.assertEqual(db.get_latest("City3").temp, 70)
+        finally:
+            db.close()
+
+    def test_failed_rename_rolls_back_drop(self):
+        conn = sqlite3.connect(os.path.join(self.tmp_dir, "rollback.db"))
+        conn.execute(migrations.WEATHER_TABLE_SQL.format(table="weather"))
+        conn.execute("INSERT INTO weather (name) VALUES ('Austin')")
+        conn.commit()
+        with self.assertRaises(sqlite3.OperationalError):
+            migrations._replace_table(conn, "weather", "no_such_table")
+        self.assertEqual(conn.execute("SELECT name FROM weather").fetchall(), [("Austin",)])
+        conn.close()
+
+
+class TestBackgroundMigrations(WeatherDBTestCase):
+    def make_legacy_db(self):
+        """Pre-versioning database with text timestamps only and a repeated observation"""
+        path = os.path.join(self.tmp_dir, "legacy_large.db")
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE weather (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, temp REAL, feels_like REAL,
+                humidity INTEGER, description TEXT, speed REAL, dt TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO weather (name, temp, humidity, description, speed, dt) VALUES (?, ?, 50, 'clear', 3, ?)",
+            [("Miami", 80.0, "2024-07-03 09:46:40"), ("Miami", 81.0, "2024-07-03 09:46:40"),
+             ("Tampa", 75.0, "2024-07-03 09:46:40")],
+        )
+        conn.commit()
+        conn.close()
+        return path
+
+    def test_data_steps_run_after_constructor_returns(self):
+        path = self.make_legacy_db()
+        gate = threading.Event()
+        messages = []
+
+        def progress(message):
+            messages.append(message)
+            if "migration 3/" in message:
+                gate.wait(5)
+
+        db = WeatherDB(path, migration_progress=progress)
+        try:
+            self.assertTrue(db.migrating())
+            self.assertEqual(migrations.get_version(db._conn), migrations.BLOCKING_VERSION)
+            # Reads use the history and writes a plain insert until the upgrade is done
+            self.assertEqual(db.get_latest("Tampa").temp, 75.0)
+            db.save(make_owm_payload("Miami", dt=1720000600, temp=85.0))
+            db.save(make_owm_payload("Miami", dt=1720000600, temp=86.0))
+
+            gate.set()
+            self.assertTrue(db.wait_for_migrations(5))
+            self.assertEqual(migrations.get_version(db._conn), migrations.WEATHER_MIGRATIONS[-1].version)
+            rows = db._conn.execute("SELECT temp, dt_epoch FROM weather WHERE name = 'Miami' ORDER BY dt_epoch").fetchall()
+            self.assertEqual(rows, [(81.0, 1720000000), (86.0, 1720000600)])
+            self.assertEqual(db.get_latest("Miami").temp, 86.0)
+            self.assertIn("Database upgrade complete (schema version 5)", messages)
+        finally:
+            gate.set()
+            db.close()
+
+    def test_close_pauses_upgrade_and_next_launch_resumes(self):
+        path = self.make_legacy_db()
+
+        def progress(message):
+            if "migration 3/" in message:
+                time.sleep(0.2)  # close() is called meanwhile
+
+        db = WeatherDB(path, migration_progress=progress)
+        db.close()
+        conn = sqlite3.connect(path)
+        self.assertEqual(migrations.get_version(conn), migrations.BLOCKING_VERSION)
+        conn.close()
+
+        db = WeatherDB(path, migration_progress=lambda message: None)
+        try:
+            self.assertTrue(db.wait_for_migrations(5))
+            self.assertEqual(migrations.get_version(db._conn), migrations.WEATHER_MIGRATIONS[-1].version)
+            self.assertEqual(db._conn.execute("SELECT COUNT(*) FROM weather WHERE dt_epoch IS NULL").fetchone()[0], 0)
+        finally:
+            db.close()
+
+    def test_new_database_migrates_synchronously(self):
+        self.assertFalse(self.db.migrating())
+        self.assertEqual(migrations.get_version(self.db._conn), migrations.WEATHER_MIGRATIONS[-1].version)
+
+
+class TestWeatherIndexes(WeatherDBTestCase):
+    """Hot read paths must stay index-only as the schema evolves"""
+
+    def plan(self, sql, params=()):
+        rows = self.db._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        return " ".join(row[-1] for row in rows)
+
+    def test_latest_entry_for_city(self):
+        plan = self.plan(f"SELECT {migrations.LATEST_WEATHER_COLUMNS} FROM latest_weather WHERE name = ?", ("Miami",))
+        self.assertIn("PRIMARY KEY", plan)
+        # History fallback used before latest_weather exists
+        plan = self.plan(
+            f"SELECT {migrations.LATEST_WEATHER_COLUMNS} FROM weather WHERE name = ? ORDER BY dt_epoch DESC LIMIT 1",
+            ("Miami",),
+        )
+        self.assertIn("ux_weather_name_dt_epoch", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_most_recent_entries(self):
+        plan = self.plan(f"SELECT {migrations.LATEST_WEATHER_COLUMNS} FROM latest_weather ORDER BY dt_epoch DESC LIMIT 1")
+        self.assertIn("idx_latest_weather_dt_epoch", plan)
+        # Recent API calls on the stat tab
+        plan = self.plan("SELECT dt_epoch, name, temp, humidity, feels_like FROM weather ORDER BY dt_epoch DESC LIMIT 3")
+        self.assertIn("idx_weather_dt_epoch", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "profile.db")
+
+    def test_performance_profile_enables_wal(self):
+        db = WeatherDB(self.db_path, profile="performance")
+        mode = db._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        sync = db._conn.execute("PRAGMA synchronous").fetchone()[0]
+        db.close()
+        self.assertEqual(mode, "wal")
+        self.assertEqual(sync, 1)  # NORMAL
+
+    def test_default_profile_leaves_journal_mode(self):
+        db = WeatherDB(self.db_path, profile="default")
+        mode = db._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        db.close()
+        self.assertEqual(mode, "delete")
+
+    def test_env_overrides_single_pragma(self):
+        with mock.patch.dict(os.environ, {"SQLITE_CACHE_SIZE": "-1024"}):
+            conn = sqlite_profile.connect(self.db_path, "performance")
+        size = conn.execute("PRAGMA cache_size").fetchone()[0]
+        conn.close()
+        self.assertEqual(size, -1024)
+
+    def test_read_only_connection_does_not_change_journal_mode(self):
+        sqlite3.connect(self.db_path).close()
+        conn = sqlite_profile.connect(self.db_path, "performance", read_only=True)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        self.assertEqual(mode, "delete")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.API.rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_immediate_then_calls_are_paced(self):
+        # 1200/min with a burst of 2 refills at (1200 - 2) / 60 ≈ 20 tokens/s
+        bucket = TokenBucket(1200, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 4 / bucket.rate * 0.9)
+        self.assertEqual(bucket.stats()["delayed_calls"], 4)
+
+    def test_threads_share_one_bucket(self):
+        bucket = TokenBucket(1200, burst=1)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - start, 4 / bucket.rate * 0.9)
+        self.assertEqual(bucket.total_calls, 5)
+
+    def test_async_acquire_and_quota_metrics(self):
+        bucket = TokenBucket(60, burst=3)
+
+        async def spend():
+            await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+        asyncio.run(spend())
+        stats = bucket.stats()
+        self.assertEqual(stats["calls_last_minute"], 3)
+        self.assertEqual(stats["remaining_this_minute"], 57)
+        self.assertEqual(stats["tokens_available"], 0)
+
+    def test_recent_calls_stay_bounded_without_stats(self):
+        bucket = TokenBucket(60, burst=1)
+        clock = iter(range(0, 10_000_000, 2))  # one call every 2 s, never waiting
+        with mock.patch("src.API.rate_limiter.time.monotonic", side_effect=lambda: next(clock)):
+            for _ in range(5000):
+                bucket._reserve()
+
+        self.assertEqual(bucket.total_calls, 5000)
+        self.assertLessEqual(len(bucket._recent), 30)
+
+    def test_rejects_non_positive_limit(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
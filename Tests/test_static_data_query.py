@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from src.DataProcessing import sqlite_profile
+from src.DataProcessing.static_data_query import StaticDataQuery, ensure_static_data_schema
+
+
+class StaticDataTestCase(unittest.TestCase):
+    """Builds a throwaway static_data table per test"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
+        self.db_path = os.path.join(self.tmp_dir, "static.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE static_data (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, temp REAL, feels_like REAL,
+                humidity INTEGER, description TEXT, speed REAL, dt TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO static_data (name, temp, feels_like, humidity, description, speed, dt) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("Miami", 80.0, None, 60, "clear", 3.0, "2024-07-05 00:00:00"),   # 5/6, newest
+                ("Miami", 81.0, 84.0, 61, "  ", 3.0, "2024-07-04 00:00:00"),     # blank text: 5/6
+                ("Miami", 82.0, 85.0, 62, "sunny", 3.0, "2024-07-01 00:00:00"),  # 6/6, older
+                ("Miami", 83.0, 86.0, 63, "rain", 3.0, "2024-07-02 00:00:00"),   # 6/6, newer
+                ("Tampa", 75.0, None, None, None, None, "2024-07-01 00:00:00"),
+            ],
+        )
+        conn.commit()
+        ensure_static_data_schema(conn)
+        conn.close()
+        self.query = StaticDataQuery(db_path=self.db_path)
+        self.addCleanup(self.query.close)
+
+
+class TestBestRecordForCity(StaticDataTestCase):
+    def test_most_complete_then_newest_record_wins(self):
+        record = self.query.get_best_record_for_city("Miami")
+        self.assertEqual((record["temp"], record["dt"]), (83.0, "2024-07-02 00:00:00"))
+        self.assertNotIn("completeness_score", record.index)
+        self.assertEqual(self.query.get_best_record_for_city("Tampa")["temp"], 75.0)
+        self.assertIsNone(self.query.get_best_record_for_city("Nowhere"))
+
+    def test_score_is_a_generated_column_served_by_an_index(self):
+        self.assertTrue(self.query.has_score_column)
+        conn = sqlite3.connect(self.db_path)
+        scores = conn.execute("SELECT completeness_score FROM static_data ORDER BY id").fetchall()
+        plan = conn.execute("""
+            EXPLAIN QUERY PLAN SELECT * FROM static_data WHERE name = ?
+            ORDER BY completeness_score DESC, dt DESC LIMIT 1
+        """, ("Miami",)).fetchall()
+        conn.close()
+        self.assertEqual([row[0] for row in scores], [5, 5, 6, 6, 2])
+        self.assertIn("idx_static_data_name_score_dt", " ".join(row[-1] for row in plan))
+        self.assertNotIn("TEMP B-TREE", " ".join(row[-1] for row in plan))
+
+    def test_setup_is_idempotent(self):
+        conn = sqlite3.connect(self.db_path)
+        ensure_static_data_schema(conn)
+        conn.close()
+        self.assertEqual(self.query.get_best_record_for_city("Miami")["temp"], 83.0)
+
+    def test_constructor_does_not_change_the_database(self):
+        path = os.path.join(self.tmp_dir, "untouched.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE static_data (id INTEGER PRIMARY KEY, name TEXT NOT NULL, temp REAL, "
+                     "feels_like REAL, humidity INTEGER, description TEXT, speed REAL, dt TEXT)")
+        conn.execute("INSERT INTO static_data (name, temp, dt) VALUES ('Miami', 80.0, '2024-07-01 00:00:00')")
+        conn.commit()
+        schema = conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()
+        conn.close()
+
+        query = StaticDataQuery(db_path=path)
+        self.assertFalse(query.has_score_column)
+        self.assertEqual(query.get_best_record_for_city("Miami")["temp"], 80.0)
+        self.assertEqual(query.get_all_cities(), ["Miami"])
+        query.close()
+
+        conn = sqlite3.connect(path)
+        self.assertEqual(conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall(), schema)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone(), journal_mode)
+        conn.close()
+
+
+class TestBestRecords(StaticDataTestCase):
+    def count_statements(self, action):
+        statements = []
+        real_connect = sqlite_profile.connect
+
+        def connect(*args, **kwargs):
+            conn = real_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with mock.patch.object(sqlite_profile, "connect", side_effect=connect):
+            result = action()
+        return result, [sql for sql in statements if "WITH wanted" in sql]
+
+    def test_many_cities_in_one_query_aligned_to_input(self):
+        records, queries = self.count_statements(
+            lambda: self.query.get_best_records(["Tampa", "Nowhere", "Miami", "Tampa"])
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(list(records.index), ["Tampa", "Nowhere", "Miami"])
+        self.assertEqual(records.loc["Miami", "temp"], 83.0)
+        self.assertEqual(records.loc["Tampa", "temp"], 75.0)
+        self.assertTrue(records.loc["Nowhere"].isna().all())
+        self.assertNotIn("completeness_score", records.columns)
+
+    def test_large_city_lists_are_chunked(self):
+        self.query.MAX_CITIES_PER_QUERY = 2
+        cities = ["Miami", "A", "B", "Tampa", "C"]
+        records, queries = self.count_statements(lambda: self.query.get_best_records(cities))
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(list(records.index), cities)
+        self.assertEqual(records["temp"].dropna().tolist(), [83.0, 75.0])
+
+    def test_comparison_data_uses_one_query(self):
+        (miami, nowhere), queries = self.count_statements(
+            lambda: self.query.get_comparison_data("Miami", "Nowhere")
+        )
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(miami["description"], "rain")
+        self.assertIsNone(nowhere)
+
+    def test_expression_fallback_without_generated_column(self):
+        self.query.has_score_column = False
+        records = self.query.get_best_records(["Miami", "Tampa"])
+        self.assertEqual(records["temp"].tolist(), [83.0, 75.0])
+
+
+class TestDatabaseStats(StaticDataTestCase):
+    def trace_aggregates(self):
+        statements = []
+        with self.query._lock:
+            self.query._connection().set_trace_callback(statements.append)
+        return statements
+
+    def test_stats_in_one_pass_and_cached_until_data_changes(self):
+        statements = self.trace_aggregates()
+        stats = self.query.get_database_stats()
+        self.assertEqual(stats['total_records'], 5)
+        self.assertEqual(stats['unique_cities'], 2)
+        self.assertEqual(stats['feels_like_records'], 3)
+        self.assertAlmostEqual(stats['completeness_percentage'], 60.0)
+        for _ in range(3):
+            self.assertEqual(self.query.get_database_stats(), stats)
+        self.assertEqual(self.query.get_city_count(), 2)
+        self.assertEqual(sum("COUNT(" in sql for sql in statements), 1)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO static_data (name, temp, feels_like) VALUES ('Orlando', 85.0, 90.0)")
+        conn.commit()
+        conn.close()
+
+        stats = self.query.get_database_stats()
+        self.assertEqual((stats['total_records'], stats['unique_cities'], stats['feels_like_records']), (6, 3, 4))
+        self.assertEqual(sum("COUNT(" in sql for sql in statements), 2)
+
+
+class TestCityList(StaticDataTestCase):
+    def test_city_list_cached_until_data_changes(self):
+        statements = []
+        with self.query._lock:
+            self.query._connection().set_trace_callback(statements.append)
+        self.assertEqual(self.query.get_all_cities(), ["Miami", "Tampa"])
+        self.query.get_all_cities().append("Mutated")  # callers get their own copy
+        self.assertEqual(self.query.get_all_cities(), ["Miami", "Tampa"])
+        self.assertEqual(sum("WITH RECURSIVE" in sql for sql in statements), 1)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO static_data (name, temp) VALUES ('Boston', 60.0)")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.query.get_all_cities(), ["Boston", "Miami", "Tampa"])
+        self.assertEqual(sum("WITH RECURSIVE" in sql for sql in statements), 2)
+
+    def test_city_list_skip_scans_the_index(self):
+        conn = sqlite3.connect(self.db_path)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT MIN(name) FROM static_data WHERE name > ?", ("Miami",)
+        ).fetchall()
+        conn.close()
+        self.assertIn("USING COVERING INDEX", " ".join(row[-1] for row in plan))
+
+    def test_city_list_without_index_uses_distinct(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP INDEX idx_static_data_name_dt")
+        conn.execute("DROP INDEX idx_static_data_name_score_dt")
+        conn.commit()
+        conn.close()
+        statements = []
+        with self.query._lock:
+            self.query._connection().set_trace_callback(statements.append)
+        self.assertEqual(self.query.get_all_cities(), ["Miami", "Tampa"])
+        self.assertFalse(any("WITH RECURSIVE" in sql for sql in statements))
+        self.assertTrue(any("SELECT DISTINCT name" in sql for sql in statements))
+
+    def test_any_name_index_enables_the_skip_scan(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP INDEX idx_static_data_name_dt")
+        conn.execute("DROP INDEX idx_static_data_name_score_dt")
+        conn.execute("CREATE INDEX other_name_index ON static_data (name, temp)")
+        conn.commit()
+        conn.close()
+        statements = []
+        with self.query._lock:
+            self.query._connection().set_trace_callback(statements.append)
+        self.assertEqual(self.query.get_all_cities(), ["Miami", "Tampa"])
+        self.assertTrue(any("WITH RECURSIVE" in sql for sql in statements))
+
+
+if __name__ == '__main__':
+    unittest.main()
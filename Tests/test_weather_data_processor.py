@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# Data/ is a standalone script directory, not a package
+_PROCESSOR_PATH = os.path.join(os.path.dirname(__file__), "..", "Data", "weather_data_processor.py")
+_spec = importlib.util.spec_from_file_location("weather_data_processor", _PROCESSOR_PATH)
+processor = importlib.util.module_from_spec(_spec)
+sys.modules["weather_data_processor"] = processor
+_spec.loader.exec_module(processor)
+
+
+class TestParallelIngest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_dir = tmp.name
+        with open(os.path.join(self.tmp_dir, "weather_data_Eric.csv"), "w") as f:
+            f.write("city,temperature,feels_like,humidity,weather_description,wind_speed,timestamp\n")
+            f.write("Austin,90.5,95.0,40,Clear Sky,5.5,2025-07-01 12:00:00\n")
+            f.write("Boston,70.0,70.0,60,Rain,10.0,not a date\n")
+        with open(os.path.join(self.tmp_dir, "weather_history_Dunasha.csv"), "w") as f:
+            f.write("07/02/2025 08:30,Denver,65.0,Cloudy\n")
+        self.extra = []
+        for i in range(3):
+            path = os.path.join(self.tmp_dir, f"extra_{i}.csv")
+            with open(path, "w") as f:
+                f.write("name,temp,feels_like,humidity,description,speed,dt\n")
+                f.write(f"City{i},{50 + i},,{30 + i},Haze,1.0,2025-07-0{i + 3} 00:00:00\n")
+            self.extra.append(path)
+
+    def _rows(self, db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            return sorted(conn.execute(
+                "SELECT name, temp, feels_like, humidity, description, speed, dt FROM static_data"
+            ).fetchall())
+        finally:
+            conn.close()
+
+    def test_find_ingest_jobs_skips_missing_files(self):
+        jobs = processor.find_ingest_jobs(self.tmp_dir, [os.path.join(self.tmp_dir, "extra_*.csv")])
+        labels = [label for label, _, _ in jobs]
+        self.assertEqual(labels, ["Eric", "Dunasha", "extra_0.csv", "extra_1.csv", "extra_2.csv"])
+
+    def test_parallel_matches_sequential(self):
+        pattern = os.path.join(self.tmp_dir, "extra_*.csv")
+        seq_db = os.path.join(self.tmp_dir, "seq.db")
+        par_db = os.path.join(self.tmp_dir, "par.db")
+        processor.main(["--data-dir", self.tmp_dir, "--extra", pattern, "--db", seq_db])
+        processor.main(["--parallel", "--workers", "2", "--batch-size", "2",
+                        "--data-dir", self.tmp_dir, "--extra", pattern, "--db", par_db])
+
+        rows = self._rows(par_db)
+        self.assertEqual(rows, self._rows(seq_db))
+        # Unparseable dt is dropped; missing values are stored as NULL
+        self.assertEqual([row[0] for row in rows], ["Austin", "City0", "City1", "City2", "Denver"])
+        self.assertEqual(rows[0], ("Austin", 90.5, 95.0, 40, "clear sky", 5.5, "2025-07-01 12:00:00"))
+        self.assertEqual(rows[-1], ("Denver", 65.0, None, None, "cloudy", None, "2025-07-02 08:30:00"))
+
+        # The load owns the static_data schema step StaticDataQuery relies on
+        conn = sqlite3.connect(par_db)
+        columns = [row[1] for row in conn.execute("PRAGMA table_xinfo(static_data)")]
+        indexes = [row[1] for row in conn.execute("PRAGMA index_list(static_data)")]
+        conn.close()
+        self.assertIn("completeness_score", columns)
+        self.assertIn("idx_static_data_name_score_dt", indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential get_weather_data loop vs. get_weather_data_many.
+
+The stub server sleeps per request to mimic upstream latency, so the
+sequential loop grows linearly with N while the batch call does not.
+Usage (from the project root):
+    python benchmarks/bench_batch_fetch.py --cities 100 --latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_owm_server import start_stub_server
+from src.API.API_call import WeatherAPI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=100, help="number of cities to fetch")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated server latency (seconds)")
+    parser.add_argument("--workers", type=int, default=20, help="max concurrent requests for the batch call")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.latency)
+    cities = [f"City{i}" for i in range(args.cities)]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            api = WeatherAPI(api_key="bench-key", gazetteer_path=":memory:", pool_size=args.workers, cache_ttl=0, calls_per_minute=0)
+            api.base_url = base_url
+
+            start = time.perf_counter()
+            for city in cities:
+                api.get_weather_data(city)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = api.get_weather_data_many(cities, max_workers=args.workers)
+            batched = time.perf_counter() - start
+            api.close()
+    finally:
+        server.shutdown()
+
+    errors = sum(1 for r in results if r["error"] is not None)
+    print(f"Cities:            {len(cities)} (errors: {errors})")
+    print(f"Sequential loop:   {sequential:.3f}s")
+    print(f"Batch ({args.workers} workers): {batched:.3f}s")
+    print(f"Speed-up:          {sequential / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: StaticDataQuery.get_best_record_for_city, pandas scoring vs SQL scoring.
+
+The old lookup loaded every row for the city into pandas and scored each
+one with df.apply; the new one reads the first entry of the
+(name, completeness_score DESC, dt DESC) index. Times both as the number
+of rows per city grows, then compares looking up all cities one at a time
+against one get_best_records call.
+Usage (from the project root):
+    python benchmarks/bench_best_record.py --rows-per-city 100 1000 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.DataProcessing.static_data_query import StaticDataQuery, ensure_static_data_schema
+
+SCHEMA = """
+    CREATE TABLE static_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        temp REAL,
+        feels_like REAL,
+        humidity INTEGER,
+        description TEXT,
+        speed REAL,
+        dt TEXT
+    )
+"""
+
+# Every third row lacks feels_like, every fifth has a blank description
+FILL = """
+    INSERT INTO static_data (name, temp, feels_like, humidity, description, speed, dt)
+    WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+    SELECT 'City' || (i % ?), 40 + (i % 60), CASE WHEN i % 3 THEN 41 + (i % 60) END, i % 100,
+           CASE WHEN i % 5 THEN 'clear sky' ELSE ' ' END, i % 30,
+           strftime('%Y-%m-%d %H:%M:%S', 1600000000 + i * 60, 'unixepoch')
+    FROM seq
+"""
+
+CITIES = 20
+
+
+def pandas_best_record(query: StaticDataQuery, city: str):
+    """The previous implementation: score every row of the city in Python"""
+    conn = sqlite3.connect(query.db_path)
+    df = pd.read_sql_query("SELECT * FROM static_data WHERE name = ?", conn, params=(city,))
+    conn.close()
+    df = df.drop(columns=["completeness_score"], errors="ignore")
+
+    def score(row):
+        total = 0
+        for field in query.data_fields:
+            value = row[field]
+            if pd.notna(value) and value is not None:
+                if not isinstance(value, str) or value.strip() != "":
+                    total += 1
+        return total
+
+    df["completeness_score"] = df.apply(score, axis=1)
+    return df.sort_values(["completeness_score", "dt"], ascending=[False, False]).iloc[0]
+
+
+def time_call(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows-per-city", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows/city':>10} {'pandas apply':>14} {'SQL index':>12}")
+    for per_city in args.rows_per_city:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            conn = sqlite3.connect(path)
+            conn.execute(SCHEMA)
+            conn.execute(FILL, (per_city * CITIES, CITIES))
+            conn.commit()
+            ensure_static_data_schema(conn)  # as weather_data_processor does after its load
+            conn.close()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                query = StaticDataQuery(db_path=path)
+                old = time_call(lambda: pandas_best_record(query, "City7"), args.repeats)
+                new = time_call(lambda: query.get_best_record_for_city("City7"), args.repeats)
+                cities = [f"City{i}" for i in range(CITIES)]
+                looped = time_call(lambda: [query.get_best_record_for_city(c) for c in cities], args.repeats)
+                batched = time_call(lambda: query.get_best_records(cities), args.repeats)
+        print(f"{per_city:>10} {old * 1000:>11.2f} ms {new * 1000:>9.2f} ms"
+              f"   {CITIES} cities: {looped * 1000:.2f} ms looped, {batched * 1000:.2f} ms in one query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hot query shapes on weather/static_data with and without the managed indexes.
+
+Builds a synthetic database (default 10M rows per table) without any of the
+managed schema objects and times each query in the form the code falls back
+to there, then lets WeatherDB and the static_data loader's schema step
+migrate and index the file and times the queries the app actually runs.
+Usage (from the project root):
+    python benchmarks/bench_indexes.py --rows 10000000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.DataProcessing.data_to_SQL import WeatherDB
+from src.DataProcessing.migrations import LATEST_WEATHER_COLUMNS, WEATHER_TABLE_SQL
+from src.DataProcessing.static_data_query import completeness_score_sql, ensure_static_data_schema
+
+STATIC_SCHEMA = """
+    CREATE TABLE static_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        temp REAL,
+        feels_like REAL,
+        humidity INTEGER,
+        description TEXT,
+        speed REAL,
+        dt TEXT
+    )
+"""
+
+# Rows generated inside SQLite so building 10M rows takes seconds, not minutes.
+# Every fifth static_data row lacks feels_like, so completeness scores differ
+FILL_WEATHER = """
+    INSERT INTO weather (name, temp, feels_like, humidity, description, speed, dt, dt_epoch)
+    WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+    SELECT 'City' || (i % ?), 40 + (i % 60), 41 + (i % 60), i % 100, 'clear sky', i % 30,
+           strftime('%Y-%m-%d %H:%M:%S', 1600000000 + i * 60, 'unixepoch'), 1600000000 + i * 60
+    FROM seq
+"""
+FILL_STATIC = """
+    INSERT INTO static_data (name, temp, feels_like, humidity, description, speed, dt)
+    WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?)
+    SELECT 'City' || (i % ?), 40 + (i % 60), CASE WHEN i % 5 THEN 41 + (i % 60) END, i % 100,
+           'clear sky', i % 30, strftime('%Y-%m-%d %H:%M:%S', 1600000000 + i * 60, 'unixepoch')
+    FROM seq
+"""
+
+SCORE_SQL = completeness_score_sql(['temp', 'feels_like', 'humidity', 'description', 'speed', 'dt'])
+BEST_RECORD = """
+    SELECT * FROM static_data WHERE id = (
+        SELECT id FROM static_data WHERE name = ? ORDER BY {score} DESC, dt DESC LIMIT 1
+    )
+"""
+CITY_SKIP_SCAN = """
+    WITH RECURSIVE cities(name) AS (
+        SELECT MIN(name) FROM static_data
+        UNION ALL
+        SELECT (SELECT MIN(name) FROM static_data WHERE name > cities.name)
+        FROM cities WHERE cities.name IS NOT NULL
+    )
+    SELECT name FROM cities WHERE name IS NOT NULL
+"""
+
+# label -> (query on the bare tables, query the app runs once migrated/indexed, params)
+QUERIES = {
+    "get_latest (latest_weather)": (
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM weather WHERE name = ? ORDER BY dt_epoch DESC LIMIT 1",
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM latest_weather WHERE name = ?",
+        ("City42",),
+    ),
+    "get_most_recent (latest_weather)": (
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM weather ORDER BY dt_epoch DESC LIMIT 1",
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM latest_weather ORDER BY dt_epoch DESC LIMIT 1",
+        (),
+    ),
+    "latest API calls (stat tab)": (
+        "SELECT dt_epoch, name, temp, humidity, feels_like FROM weather ORDER BY dt_epoch DESC LIMIT 3",
+        "SELECT dt_epoch, name, temp, humidity, feels_like FROM weather ORDER BY dt_epoch DESC LIMIT 3",
+        (),
+    ),
+    "get_best_record_for_city": (
+        BEST_RECORD.format(score=f"({SCORE_SQL})"),
+        BEST_RECORD.format(score="completeness_score"),
+        ("City42",),
+    ),
+    "get_all_cities": (
+        "SELECT DISTINCT name FROM static_data WHERE name IS NOT NULL ORDER BY name",
+        CITY_SKIP_SCAN,
+        (),
+    ),
+}
+
+
+def build_database(path: str, rows: int, cities: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(WEATHER_TABLE_SQL.format(table="weather"))
+    conn.execute(FILL_WEATHER, (rows, cities))
+    conn.execute(STATIC_SCHEMA)
+    conn.execute(FILL_STATIC, (rows, cities))
+    conn.commit()
+    conn.close()
+
+
+def time_queries(path: str, repeats: int, indexed: bool) -> dict:
+    conn = sqlite3.connect(path)
+    timings = {}
+    for label, (bare_sql, indexed_sql, params) in QUERIES.items():
+        sql = indexed_sql if indexed else bare_sql
+        conn.execute(sql, params).fetchall()  # warm the page cache
+        start = time.perf_counter()
+        for _ in range(repeats):
+            conn.execute(sql, params).fetchall()
+        timings[label] = (time.perf_counter() - start) / repeats
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="rows per table")
+    parser.add_argument("--cities", type=int, default=1000, help="distinct city names")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_weather.db")
+        print(f"Building {args.rows:,} rows per table...")
+        start = time.perf_counter()
+        build_database(path, args.rows, args.cities)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        before = time_queries(path, args.repeats, indexed=False)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = WeatherDB(path)
+            db.wait_for_migrations()  # the data steps run in the background on a populated file
+            db.close()
+            conn = sqlite3.connect(path)
+            ensure_static_data_schema(conn)
+            conn.close()
+        print(f"Migrations and index creation: {time.perf_counter() - start:.1f}s")
+
+        after = time_queries(path, max(args.repeats, 100), indexed=True)
+
+    print(f"\n{'Query':34} {'full scan':>12} {'indexed':>12}")
+    for label in QUERIES:
+        print(f"{label:34} {before[label] * 1000:>9.3f} ms {after[label] * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
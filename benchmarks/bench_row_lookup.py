@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-row "current conditions" lookup as a pandas Series vs a WeatherRecord.
+
+Times the old path (pd.read_sql_query(...).iloc[0]) against
+fetch_last_data_entry, which builds a WeatherRecord straight from the
+sqlite3 cursor. Both open a connection per call, as the GUI does.
+Usage (from the project root):
+    python benchmarks/bench_row_lookup.py --lookups 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.DataProcessing import sqlite_profile
+from src.DataProcessing.data_query import fetch_last_data_entry
+from src.DataProcessing.data_to_SQL import WeatherDB
+
+
+def pandas_lookup(city: str, db_path: str):
+    conn = sqlite_profile.connect(db_path, read_only=True)
+    df = pd.read_sql_query("SELECT * FROM latest_weather WHERE name = ?", conn, params=(city,))
+    conn.close()
+    return df.iloc[0] if not df.empty else None
+
+
+def time_lookups(fn, db_path: str, lookups: int) -> float:
+    start = time.perf_counter()
+    for i in range(lookups):
+        fn(f"City{i % 50}", db_path)
+    return (time.perf_counter() - start) / lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=2000, help="lookups per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            with WeatherDB(db_path) as db:
+                db.save_many({
+                    "name": f"City{i % 50}",
+                    "main": {"temp": 70, "feels_like": 71, "humidity": 50},
+                    "weather": [{"description": "clear sky"}],
+                    "wind": {"speed": 4.0},
+                    "dt": 1720000000 + i,
+                } for i in range(5000))
+
+        df_time = time_lookups(pandas_lookup, db_path, args.lookups)
+        record_time = time_lookups(fetch_last_data_entry, db_path, args.lookups)
+
+    print(f"pandas Series:  {df_time * 1e6:8.1f} us/lookup")
+    print(f"WeatherRecord:  {record_time * 1e6:8.1f} us/lookup  ({df_time / record_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
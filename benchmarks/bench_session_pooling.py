@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bare requests.get vs. WeatherAPI's pooled keep-alive session.
+
+Runs both against a local stub HTTP server so only connection setup differs.
+Usage (from the project root):
+    python benchmarks/bench_session_pooling.py --cities 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_owm_server import start_stub_server
+from src.API.API_call import WeatherAPI
+
+
+def bench_bare_requests(base_url: str, cities) -> float:
+    start = time.perf_counter()
+    for city in cities:
+        response = requests.get(base_url, params={"q": city, "appid": "bench", "units": "imperial"})
+        response.raise_for_status()
+        response.json()
+    return time.perf_counter() - start
+
+
+def bench_pooled_session(base_url: str, cities) -> float:
+    with WeatherAPI(api_key="bench-key", gazetteer_path=":memory:", cache_ttl=0, calls_per_minute=0) as api:
+        api.base_url = base_url
+        start = time.perf_counter()
+        for city in cities:
+            api.get_weather_data(city)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=200, help="number of sequential city lookups")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    cities = [f"City{i}" for i in range(args.cities)]
+    try:
+        # Silence the per-request [INFO]/[DEBUG] prints so they don't skew timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            bench_pooled_session(base_url, cities[:5])  # warm-up
+            bare = bench_bare_requests(base_url, cities)
+            pooled = bench_pooled_session(base_url, cities)
+    finally:
+        server.shutdown()
+
+    n = len(cities)
+    print(f"Cities polled:        {n}")
+    print(f"requests.get (fresh): {bare:.3f}s  ({bare / n * 1000:.3f} ms/call)")
+    print(f"WeatherAPI (pooled):  {pooled:.3f}s  ({pooled / n * 1000:.3f} ms/call)")
+    print(f"Saved per call:       {(bare - pooled) / n * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
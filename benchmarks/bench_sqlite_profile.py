@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent reads and writes under the "default" and "performance" SQLite profiles.
+
+One writer thread saves observations through WeatherDB (one commit each)
+while reader threads repeatedly run the latest-entry lookup, as the GUI
+does. Reports writer throughput and reader latency for each profile.
+Usage (from the project root):
+    python benchmarks/bench_sqlite_profile.py --writes 2000 --readers 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.DataProcessing import sqlite_profile
+from src.DataProcessing.data_to_SQL import WeatherDB
+
+LATEST_SQL = "SELECT * FROM weather WHERE name = ? ORDER BY dt_epoch DESC LIMIT 1"
+
+
+def payload(i: int) -> dict:
+    return {
+        "name": f"City{i % 50}",
+        "main": {"temp": 70 + i % 10, "feels_like": 71, "humidity": 50},
+        "weather": [{"description": "clear sky"}],
+        "wind": {"speed": 4.0},
+        "dt": 1720000000 + i,
+    }
+
+
+def run(profile: str, writes: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = WeatherDB(path, profile=profile)
+
+        done = threading.Event()
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def reader(n):
+            conn = sqlite_profile.connect(path, profile, read_only=True)
+            local = []
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    conn.execute(LATEST_SQL, (f"City{n % 50}",)).fetchone()
+                    local.append(time.perf_counter() - start)
+                except Exception as e:
+                    errors.append(e)
+                n += 1
+            conn.close()
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(writes):
+                db.save(payload(i))
+        write_time = time.perf_counter() - start
+
+        done.set()
+        for thread in threads:
+            thread.join()
+        db.close()
+
+    latencies.sort()
+    return {
+        "writes_per_sec": writes / write_time,
+        "reads": len(latencies),
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writes", type=int, default=2000, help="single-row commits by the writer")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent reader threads")
+    args = parser.parse_args()
+
+    print(f"{'profile':12} {'writes/s':>10} {'reads':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for profile in ("default", "performance"):
+        r = run(profile, args.writes, args.readers)
+        print(f"{profile:12} {r['writes_per_sec']:>10.0f} {r['reads']:>9} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
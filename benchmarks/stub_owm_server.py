@@ -0,0 +1,64 @@
+"""
+Local stub of the OpenWeatherMap current-weather endpoint for benchmarks.
+Speaks HTTP/1.1 so clients can keep connections alive between requests.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def make_payload(city: str, city_id: int = 0) -> dict:
+    """Build a minimal OWM-shaped response for a city"""
+    return {
+        "id": city_id or (abs(hash(city)) % 10_000_000),
+        "name": city,
+        "main": {"temp": 72.5, "feels_like": 73.1, "humidity": 55},
+        "weather": [{"description": "clear sky"}],
+        "wind": {"speed": 5.2},
+        "dt": int(time.time()),
+    }
+
+
+class StubOWMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # avoid delayed-ACK stalls on keep-alive connections
+    delay = 0.0  # simulated server processing time (seconds)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if self.delay:
+            time.sleep(self.delay)
+
+        if parsed.path.endswith("/group"):
+            ids = [int(i) for i in query.get("id", [""])[0].split(",") if i]
+            body = {"cnt": len(ids), "list": [make_payload(f"City{i}", i) for i in ids]}
+        elif "id" in query:
+            city_id = int(query["id"][0])
+            body = make_payload(f"City{city_id}", city_id)
+        else:
+            body = make_payload(query.get("q", ["Unknown"])[0])
+
+        encoded = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output quiet
+
+
+def start_stub_server(delay: float = 0.0):
+    """Start the stub server on a free local port; returns (server, base_url)"""
+    handler = type("DelayedStubOWMHandler", (StubOWMHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/data/2.5/weather"
@@ -4,10 +4,10 @@ Script to convert SQLite weather database to CSV format.
 Converts Data/weather_data.db to EHWeatherData.csv in the root directory.
 """
 
-import sqlite3
 import csv
 import os
 from pathlib import Path
+from src.DataProcessing import sqlite_profile
 
 
 def convert_sqlite_to_csv():
@@ -27,7 +27,7 @@ def convert_sqlite_to_csv():
     
     try:
         # Connect to SQLite database
-        conn = sqlite3.connect(str(db_path))
+        conn = sqlite_profile.connect(str(db_path), read_only=True)
         cursor = conn.cursor()
         
         # Get all data from weather table
@@ -4,20 +4,63 @@ This module provides a complete interface to the OpenWeatherMap API,
 with environment variable management and error handling.
 """
 
+import copy
 import os
+import time
 import requests 
-from typing import Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dotenv import load_dotenv
 import json
 from pathlib import Path
+from src.API.gazetteer import CityGazetteer
+from src.API.rate_limiter import TokenBucket
+from src.API.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, is_upstream_failure
+from src.API.response_cache import ResponseCache
+from src.API.single_flight import SingleFlight
+from src.ErrorHandling.error_handling_entry import CityNameHandler
+
+# Default connect/read timeouts (seconds) applied to every request
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_POOL_SIZE = 10
+# OpenWeatherMap refreshes current conditions roughly every 10 minutes
+DEFAULT_CACHE_TTL = 600
+DEFAULT_CACHE_SIZE = 256
+# Free OpenWeatherMap plan limit
+DEFAULT_CALLS_PER_MINUTE = 60
+# Max city IDs OpenWeatherMap accepts per /group request
+GROUP_REQUEST_SIZE = 20
 
 class WeatherAPI:
     """Handles all OpenWeatherMap API interactions"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool_size: Optional[int] = None,
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                 cache_ttl: Optional[float] = None, cache_size: Optional[int] = None,
+                 cache_path: Optional[str] = None, calls_per_minute: Optional[int] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None,
+                 gazetteer_path: Optional[str] = None):
         """
         Initialize the WeatherAPI with optional API key.
         If no key is provided, loads from environment variables.
+
+        Args:
+            api_key (str): OpenWeatherMap API key (defaults to OPENWEATHER_API_KEY)
+            pool_size (int): Max pooled keep-alive connections (defaults to OPENWEATHER_POOL_SIZE or 10)
+            timeout (float | tuple): Per-request (connect, read) timeout in seconds
+                (defaults to OPENWEATHER_TIMEOUT or (3.05, 10))
+            cache_ttl (float): Seconds a response is reused (defaults to OPENWEATHER_CACHE_TTL or 600; 0 disables)
+            cache_size (int): Max cached cities (defaults to OPENWEATHER_CACHE_SIZE or 256)
+            cache_path (str): JSON file that keeps the cache across restarts (defaults to OPENWEATHER_CACHE_FILE)
+            calls_per_minute (int): Plan rate limit enforced client-side
+                (defaults to OPENWEATHER_CALLS_PER_MINUTE or 60; 0 disables)
+            retry_policy (RetryPolicy): Backoff for timeouts/5xx/429
+                (defaults from OPENWEATHER_MAX_RETRIES, OPENWEATHER_BACKOFF_BASE, OPENWEATHER_BACKOFF_MAX)
+            circuit_breaker (CircuitBreaker): Fail-fast guard for upstream outages
+                (defaults from OPENWEATHER_BREAKER_THRESHOLD, OPENWEATHER_BREAKER_RESET)
+            gazetteer_path (str): SQLite file mapping city names to OWM IDs
+                (defaults to OPENWEATHER_GAZETTEER_DB or Data/city_gazetteer.db)
         """
         # Load environment variables
         env_path = Path(__file__).parent.parent.parent / '.env'
@@ -32,8 +75,72 @@ class WeatherAPI:
         self.unit_symbol = "°F" if temp_unit == "fahrenheit" else "°C"
         
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.group_url = "http://api.openweathermap.org/data/2.5/group"
+
+        # Long-lived pooled session so repeated lookups reuse keep-alive connections
+        self.pool_size = pool_size or int(os.getenv("OPENWEATHER_POOL_SIZE", DEFAULT_POOL_SIZE))
+        if timeout is None:
+            env_timeout = os.getenv("OPENWEATHER_TIMEOUT")
+            timeout = float(env_timeout) if env_timeout else DEFAULT_TIMEOUT
+        self.timeout = timeout
+        self.session = self._create_session()
+
+        # Response cache keyed on normalized city + units
+        if cache_ttl is None:
+            cache_ttl = float(os.getenv("OPENWEATHER_CACHE_TTL", DEFAULT_CACHE_TTL))
+        cache_size = cache_size or int(os.getenv("OPENWEATHER_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+        cache_path = cache_path or os.getenv("OPENWEATHER_CACHE_FILE") or None
+        self.cache = ResponseCache(cache_ttl, cache_size, cache_path) if cache_ttl > 0 else None
+
+        # Token bucket shared by every request this instance makes
+        if calls_per_minute is None:
+            calls_per_minute = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", DEFAULT_CALLS_PER_MINUTE))
+        burst = os.getenv("OPENWEATHER_RATE_BURST")
+        self.rate_limiter = TokenBucket(calls_per_minute, int(burst) if burst else None) if calls_per_minute > 0 else None
+
+        # Retry transient failures, and stop calling upstream while it is unhealthy
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_retries=int(os.getenv("OPENWEATHER_MAX_RETRIES", 2)),
+            base_delay=float(os.getenv("OPENWEATHER_BACKOFF_BASE", 0.5)),
+            max_delay=float(os.getenv("OPENWEATHER_BACKOFF_MAX", 8.0)),
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("OPENWEATHER_BREAKER_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("OPENWEATHER_BREAKER_RESET", 30)),
+        )
+
+        # Concurrent lookups for the same city share one upstream call
+        self.in_flight = SingleFlight()
+
+        # Normalized city name -> OWM city ID/coordinates, learned from responses
+        self.gazetteer = CityGazetteer(gazetteer_path or os.getenv("OPENWEATHER_GAZETTEER_DB") or None)
         print(f"[INFO] WeatherAPI initialized. Using API key: {self.api_key[:5]}... | Units: {self.units}")
 
+    def _create_session(self) -> requests.Session:
+        """Build a requests Session with a sized connection pool and gzip negotiation"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        return session
+
+    def close(self) -> None:
+        """Close the pooled session and gazetteer, and persist the response cache"""
+        self.session.close()
+        self.gazetteer.close()
+        if self.cache is not None:
+            self.cache.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def get_weather_data(self, city: str) -> Dict[str, Any]:
         """
         Fetch weather data for a given city.
@@ -51,16 +158,110 @@ class WeatherAPI:
         if not city:
             raise ValueError("City name cannot be empty")
 
+        cache_key = self._cache_key(city)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print(f"[INFO] Using cached weather data for {city}")
+                return cached
+
+        try:
+            data = self.in_flight.do(cache_key, lambda: self._fetch_and_cache(city, cache_key))
+        except requests.exceptions.RequestException as err:
+            # While upstream is unhealthy, an expired cached response beats an error
+            stale = self.cache.get_stale(cache_key) if self.cache is not None else None
+            if stale is not None and is_upstream_failure(err):
+                print(f"[WARN] OpenWeatherMap unavailable ({err}); serving last cached data for {city}")
+                stale['_stale'] = True
+                return stale
+            raise
+        return data
+
+    def _fetch_and_cache(self, city: str, cache_key: str) -> Dict[str, Any]:
+        """Request a city from the API and store the response in the cache"""
+        data = self._request_weather(city)
+        self.gazetteer.record(city, data)
+        if self.cache is not None:
+            self.cache.put(cache_key, data)
+        return data
+
+    def _cache_key(self, city: str) -> str:
+        """Cache key for a city: normalized name plus unit system"""
+        return f"{CityNameHandler.normalize_city_name(city)}|{self.units}"
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the response cache (empty if caching is disabled)"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        """Upstream calls executed vs. lookups that joined an in-flight call"""
+        return self.in_flight.stats()
+
+    def quota_status(self) -> Dict[str, Any]:
+        """Client-side rate limiter metrics (empty if rate limiting is disabled)"""
+        return self.rate_limiter.stats() if self.rate_limiter is not None else {}
+
+    def health_status(self) -> Dict[str, Any]:
+        """Circuit breaker state and counters"""
+        return self.circuit_breaker.stats()
+
+    def _send(self, url: str, params: Dict[str, Any], label: str) -> requests.Response:
+        """
+        GET a URL through the rate limiter, retrying transient failures.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open (no request is sent)
+            requests.exceptions.RequestException: If the request fails for good
+        """
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(f"OpenWeatherMap circuit is open; not requesting {label}")
+
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            try:
+                if self.rate_limiter is not None:
+                    waited = self.rate_limiter.acquire()
+                    if waited > 0:
+                        print(f"[INFO] Rate limit reached, waited {waited:.2f}s before requesting {label}")
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+                self.circuit_breaker.record_success()
+                return response
+            except requests.exceptions.RequestException as err:
+                if not is_upstream_failure(err):
+                    # The API answered (e.g. 401/404), so it is healthy
+                    self.circuit_breaker.record_success()
+                    raise
+                if attempt == self.retry_policy.max_attempts:
+                    self.circuit_breaker.record_failure()
+                    raise
+                retry_after = None
+                if getattr(err, 'response', None) is not None:
+                    header = err.response.headers.get('Retry-After')
+                    retry_after = float(header) if header and header.isdigit() else None
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                print(f"[WARN] Attempt {attempt} for {label} failed ({err}); retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _request_weather(self, city: str) -> Dict[str, Any]:
+        """Call the current-weather endpoint for a city (no caching)"""
+        if self.gazetteer.is_invalid(city):
+            print(f"[ERROR] City '{city}' not found (rejected by OpenWeatherMap earlier)")
+            raise ValueError(f"City '{city}' not found")
+
         params = {
             'q': city,
             'appid': self.api_key,
             'units': self.units  # ← FIXED: Use self.units instead of hardcoded 'imperial'
         }
+        known = self.gazetteer.lookup(city)
+        if known is not None:
+            # Exact ID lookup instead of free-text name resolution
+            params.pop('q')
+            params['id'] = known['city_id']
         
         try:
             print(f"[INFO] Requesting weather data for {city} using {self.units} units...")
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
+            response = self._send(self.base_url, params, city)
             
             data = response.json()
             # Add unit info to response for display purposes
@@ -74,16 +275,145 @@ class WeatherAPI:
             
         except requests.exceptions.HTTPError as http_err:
             print(f"[ERROR] HTTP error occurred: {http_err}")
-            if response.status_code == 401:
+            status_code = http_err.response.status_code if http_err.response is not None else None
+            if status_code == 401:
                 print("[ERROR] Check if your API key is valid and activated")
-            elif response.status_code == 404:
+            elif status_code == 404:
                 print(f"[ERROR] City '{city}' not found")
+                self.gazetteer.mark_invalid(city)
             raise
             
         except Exception as err:
             print(f"[ERROR] An error occurred: {err}")
             raise
 
+    def get_weather_data_many(self, cities: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch weather data for many cities concurrently.
+
+        Requests run on a bounded thread pool, so at most ``max_workers``
+        are in flight at once (defaults to the connection pool size).
+        A failure for one city does not affect the others.
+
+        Args:
+            cities (list): City names to look up
+            max_workers (int): Cap on concurrent in-flight requests
+
+        Returns:
+            list: One dict per input city, in input order, with keys
+                'city', 'data' (weather dict or None) and 'error' (exception or None)
+        """
+        if not cities:
+            return []
+
+        workers = max(1, min(max_workers or self.pool_size, len(cities)))
+        print(f"[INFO] Fetching weather for {len(cities)} cities with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="owm-fetch") as pool:
+            return list(pool.map(self._fetch_city_result, cities))
+
+    def _fetch_city_result(self, city: str) -> Dict[str, Any]:
+        """Wrap get_weather_data so errors are reported per city instead of raised"""
+        try:
+            return {'city': city, 'data': self.get_weather_data(city), 'error': None}
+        except Exception as err:
+            return {'city': city, 'data': None, 'error': err}
+
+    def get_weather_data_bulk(self, cities: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch many cities using OpenWeatherMap's multi-city group endpoint.
+
+        Cities whose IDs are already in the gazetteer are sent 20 per request;
+        unknown cities are looked up individually once (which records their
+        IDs for next time). Fresh cached responses are used without any request.
+
+        Args:
+            cities (list): City names to look up
+            max_workers (int): Cap on concurrent in-flight requests
+
+        Returns:
+            list: Same shape as get_weather_data_many - one dict per input city,
+                in input order, with keys 'city', 'data' and 'error'
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(cities)
+        by_id: Dict[int, List[int]] = {}
+        unresolved: List[int] = []
+
+        for index, city in enumerate(cities):
+            if not city:
+                results[index] = {'city': city, 'data': None, 'error': ValueError("City name cannot be empty")}
+                continue
+            cached = self.cache.get(self._cache_key(city)) if self.cache is not None else None
+            if cached is not None:
+                results[index] = {'city': city, 'data': cached, 'error': None}
+                continue
+            known = self.gazetteer.lookup(city)
+            if known is not None:
+                by_id.setdefault(known['city_id'], []).append(index)
+            else:
+                unresolved.append(index)
+
+        # Unknown IDs: fall back to per-city requests
+        if unresolved:
+            for index, result in zip(unresolved, self.get_weather_data_many([cities[i] for i in unresolved], max_workers)):
+                results[index] = result
+
+        # Known IDs: one group request per 20 cities
+        ids = list(by_id)
+        chunks = [ids[i:i + GROUP_REQUEST_SIZE] for i in range(0, len(ids), GROUP_REQUEST_SIZE)]
+        if chunks:
+            print(f"[INFO] Fetching {len(ids)} cities in {len(chunks)} group requests...")
+            workers = max(1, min(max_workers or self.pool_size, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="owm-group") as pool:
+                for chunk, outcome in zip(chunks, pool.map(self._fetch_group_result, chunks)):
+                    for city_id in chunk:
+                        for index in by_id[city_id]:
+                            results[index] = self._group_city_result(cities[index], city_id, outcome)
+        return results
+
+    def _fetch_group_result(self, city_ids: List[int]) -> Union[Dict[int, Dict[str, Any]], Exception]:
+        """Run one group request, returning the error instead of raising it"""
+        try:
+            return self._request_group(city_ids)
+        except Exception as err:
+            return err
+
+    def _request_group(self, city_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Call the group endpoint for up to 20 IDs; returns city ID -> per-city weather dict"""
+        params = {
+            'id': ",".join(str(city_id) for city_id in city_ids),
+            'appid': self.api_key,
+            'units': self.units
+        }
+        print(f"[INFO] Requesting group weather data for {len(city_ids)} cities using {self.units} units...")
+        response = self._send(self.group_url, params, f"group of {len(city_ids)} cities")
+
+        items = {}
+        for item in response.json().get('list', []):
+            # Each list item has the same shape as a /weather response
+            item['_unit_info'] = {
+                'symbol': self.unit_symbol,
+                'system': self.units
+            }
+            items[item.get('id')] = item
+        return items
+
+    def _group_city_result(self, city: str, city_id: int, outcome) -> Dict[str, Any]:
+        """Turn one group request outcome into the per-city result dict for a single city"""
+        cache_key = self._cache_key(city)
+        if isinstance(outcome, Exception):
+            stale = self.cache.get_stale(cache_key) if self.cache is not None else None
+            if stale is not None and is_upstream_failure(outcome):
+                stale['_stale'] = True
+                return {'city': city, 'data': stale, 'error': None}
+            return {'city': city, 'data': None, 'error': outcome}
+
+        data = outcome.get(city_id)
+        if data is None:
+            return {'city': city, 'data': None, 'error': ValueError(f"No data returned for {city} (ID {city_id})")}
+        if self.cache is not None:
+            self.cache.put(cache_key, data)
+        return {'city': city, 'data': copy.deepcopy(data), 'error': None}
+
     def save_to_file(self, data: Dict[str, Any], filename: str = "weather_data.json") -> None:
         """Save weather data to a JSON file"""
         try:
@@ -102,10 +432,15 @@ def main():
         # Example cities
         cities = ["London", "New York", "Tokyo"]
         
-        # Fetch and save weather data for each city
-        for city in cities:
+        # Fetch all cities concurrently, then report and save each one
+        for result in weather_api.get_weather_data_many(cities):
+            city = result['city']
+            if result['error'] is not None:
+                print(f"[ERROR] Failed to process {city}: {result['error']}")
+                continue
+
             try:
-                data = weather_api.get_weather_data(city)
+                data = result['data']
                 unit_symbol = data.get('_unit_info', {}).get('symbol', '°F')
                 
                 print(f"\nWeather in {city} (OpenWeatherMap field order):")
@@ -123,6 +458,8 @@ def main():
             except Exception as e:
                 print(f"[ERROR] Failed to process {city}: {e}")
                 continue
+
+        weather_api.close()
                 
     except Exception as e:
         print(f"[ERROR] Application error: {e}")
@@ -0,0 +1,171 @@
+"""
+Local city gazetteer backed by SQLite.
+Maps normalized city names (CityNameHandler.normalize_city_name) to
+OpenWeatherMap city IDs and coordinates, learned from API responses, so
+repeat lookups can query by exact ID and known-bad names are rejected
+without a round trip.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.ErrorHandling.error_handling_entry import CityNameHandler
+
+# How long a name OpenWeatherMap rejected (404) stays rejected locally
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+
+
+class CityGazetteer:
+    """Name / ID / coordinate index of cities seen in OpenWeatherMap responses"""
+
+    def __init__(self, db_path: Optional[str] = None, negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        Args:
+            db_path (str): SQLite file (defaults to Data/city_gazetteer.db; ':memory:' for a throwaway store)
+            negative_ttl (float): Seconds a rejected city name is remembered
+        """
+        if db_path is None:
+            data_folder = Path(__file__).parent.parent.parent / "Data"
+            data_folder.mkdir(exist_ok=True)
+            db_path = str(data_folder / "city_gazetteer.db")
+        self.db_path = db_path
+        self.negative_ttl = negative_ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+        # Name lookups are on the request path, so keep them in memory
+        self._by_name: Dict[str, Dict[str, Any]] = {
+            row['norm_name']: dict(row) for row in self._conn.execute("SELECT * FROM city_gazetteer")
+        }
+        print(f"[INFO] City gazetteer loaded {len(self._by_name)} names from {self.db_path}")
+
+    def _ensure_schema(self):
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS city_gazetteer (
+                    norm_name TEXT PRIMARY KEY,
+                    city_id INTEGER NOT NULL,
+                    name TEXT,
+                    country TEXT,
+                    lat REAL,
+                    lon REAL,
+                    updated_at INTEGER
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_city_gazetteer_city_id ON city_gazetteer (city_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_city_gazetteer_lat_lon ON city_gazetteer (lat, lon)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS invalid_cities (
+                    norm_name TEXT PRIMARY KEY,
+                    checked_at INTEGER
+                )
+            """)
+
+    @staticmethod
+    def _normalize(city: str) -> str:
+        return CityNameHandler.normalize_city_name(city)
+
+    def lookup(self, city: str) -> Optional[Dict[str, Any]]:
+        """Entry for a city name (any capitalization/shorthand), or None if unknown"""
+        entry = self._by_name.get(self._normalize(city))
+        return dict(entry) if entry is not None else None
+
+    def lookup_id(self, city_id: int) -> Optional[Dict[str, Any]]:
+        """Entry for an OpenWeatherMap city ID, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM city_gazetteer WHERE city_id = ? ORDER BY updated_at DESC LIMIT 1", (city_id,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def nearest(self, lat: float, lon: float, max_km: float = 50.0) -> Optional[Dict[str, Any]]:
+        """Closest known city within max_km of the coordinates, or None"""
+        # Bounding box on the (lat, lon) index, then exact distance on the few candidates
+        lat_delta = max_km / 111.0
+        lon_delta = max_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM city_gazetteer
+                WHERE lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?
+            """, (lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta)).fetchall()
+
+        best, best_km = None, max_km
+        for row in rows:
+            km = self._distance_km(lat, lon, row['lat'], row['lon'])
+            if km <= best_km:
+                best, best_km = dict(row), km
+        return best
+
+    @staticmethod
+    def _distance_km(lat1, lon1, lat2, lon2) -> float:
+        """Great-circle (haversine) distance in kilometres"""
+        p1, p2 = math.radians(lat1), math.radians(lat2)
+        dp, dl = p2 - p1, math.radians(lon2 - lon1)
+        a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+        return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+    def record(self, city: str, data: Dict[str, Any]) -> None:
+        """
+        Learn the ID/coordinates in an API response under the queried name.
+
+        The name in the response is not stored: a qualified query ("London,CA")
+        returns a bare name ("London") that may mean a different city.
+        """
+        city_id = data.get('id')
+        if not city_id:
+            return
+        coord = data.get('coord') or {}
+        name = self._normalize(city)
+        entry = {
+            'norm_name': name,
+            'city_id': city_id,
+            'name': data.get('name'),
+            'country': (data.get('sys') or {}).get('country'),
+            'lat': coord.get('lat'),
+            'lon': coord.get('lon'),
+            'updated_at': int(time.time()),
+        }
+
+        if self._by_name.get(name, {}).get('city_id') == city_id:
+            return  # nothing new, skip the write
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO city_gazetteer (norm_name, city_id, name, country, lat, lon, updated_at)
+                VALUES (:norm_name, :city_id, :name, :country, :lat, :lon, :updated_at)
+                ON CONFLICT(norm_name) DO UPDATE SET
+                    city_id = excluded.city_id, name = excluded.name, country = excluded.country,
+                    lat = excluded.lat, lon = excluded.lon, updated_at = excluded.updated_at
+            """, entry)
+            self._conn.execute("DELETE FROM invalid_cities WHERE norm_name = ?", (name,))
+            self._by_name[name] = entry
+
+    def mark_invalid(self, city: str) -> None:
+        """Remember that OpenWeatherMap does not know this city name"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO invalid_cities (norm_name, checked_at) VALUES (?, ?)
+                ON CONFLICT(norm_name) DO UPDATE SET checked_at = excluded.checked_at
+            """, (self._normalize(city), int(time.time())))
+
+    def is_invalid(self, city: str) -> bool:
+        """True if the name was rejected by OpenWeatherMap within the negative TTL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT checked_at FROM invalid_cities WHERE norm_name = ?", (self._normalize(city),)
+            ).fetchone()
+        return row is not None and time.time() - row[0] < self.negative_ttl
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
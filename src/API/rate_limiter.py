@@ -0,0 +1,104 @@
+"""
+Client-side token-bucket rate limiter for the OpenWeatherMap API.
+Callers reserve a token before each request; when the bucket is empty
+they are queued (by sleeping) instead of being rejected, so bulk jobs
+run at the highest rate the plan allows without triggering 429s.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from both threads and asyncio coroutines"""
+
+    def __init__(self, calls_per_minute: int, burst: Optional[int] = None):
+        """
+        Args:
+            calls_per_minute (int): Hard per-minute limit of the API plan
+            burst (int): Tokens that may be spent back-to-back (defaults to 10% of the limit).
+                The refill rate is reduced by the burst so that no rolling
+                60 second window can ever exceed calls_per_minute.
+        """
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        self.calls_per_minute = calls_per_minute
+        self.capacity = max(1, min(burst or calls_per_minute // 10, calls_per_minute))
+        # Leave room for a full burst inside any rolling minute
+        self.rate = max(calls_per_minute - self.capacity, 1) / 60.0  # tokens per second
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._recent = deque()  # scheduled start times of calls, for the rolling minute
+        self.total_calls = 0
+        self.delayed_calls = 0
+        self.total_wait = 0.0
+
+    def _prune(self, now: float) -> None:
+        """Forget calls that started over a minute ago (caller holds the lock)"""
+        while self._recent and self._recent[0] <= now - 60:
+            self._recent.popleft()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly going into debt) and return how long the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            self.total_calls += 1
+            if wait > 0:
+                self.delayed_calls += 1
+                self.total_wait += wait
+            self._recent.append(now + wait)
+            # Pruned here as well as in stats() so the deque stays bounded for callers that never read stats
+            self._prune(now)
+            return wait
+
+    def acquire(self) -> float:
+        """Block the calling thread until a token is available; returns seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Coroutine version of acquire() that yields to the event loop while waiting"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def remaining(self) -> int:
+        """Tokens that can be spent right now without waiting"""
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            return max(int(tokens), 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Quota usage metrics for monitoring bulk jobs"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            calls_last_minute = sum(1 for started in self._recent if started <= now)
+            queued = len(self._recent) - calls_last_minute
+            return {
+                'calls_per_minute': self.calls_per_minute,
+                'calls_last_minute': calls_last_minute,
+                'remaining_this_minute': max(self.calls_per_minute - calls_last_minute - queued, 0),
+                'tokens_available': max(int(tokens), 0),
+                'queued': queued,
+                'total_calls': self.total_calls,
+                'delayed_calls': self.delayed_calls,
+                'total_wait_seconds': round(self.total_wait, 3),
+            }
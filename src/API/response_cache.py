@@ -0,0 +1,167 @@
+"""
+LRU cache, and the TTL response cache for OpenWeatherMap lookups built on it.
+OpenWeatherMap only refreshes current conditions about every 10 minutes,
+so repeat lookups inside that window can be served from memory.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Returned by LRUCache.get() on a miss, so None can be cached as a value
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe size-bounded LRU map with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Args:
+            max_entries (int): Size bound; least recently used entries are evicted first
+        """
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Any, default: Any = MISSING, valid: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the value for key, or default on a miss.
+
+        Args:
+            valid (callable): Optional check on the stored value; a value that
+                fails it counts as a miss but is kept (see peek)
+        """
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING or (valid is not None and not valid(value)):
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Any, default: Any = MISSING) -> Any:
+        """Return the stored value for key without validation, counters or recency update"""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[Any]) -> None:
+        """Drop the entries for keys (missing keys are ignored)"""
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, MISSING) is not MISSING:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """Snapshot of (key, value) pairs, least recently used first"""
+        with self._lock:
+            return list(self._entries.items())
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache(LRUCache):
+    """LRUCache of API responses, stored as (expires_at, data), that expire after a fixed TTL"""
+
+    def __init__(self, ttl: float = 600, max_entries: int = 256, persist_path: Optional[str] = None):
+        """
+        Args:
+            ttl (float): Seconds an entry stays fresh
+            max_entries (int): Size bound; least recently used entries are evicted first
+            persist_path (str): Optional JSON file used to keep entries across restarts
+        """
+        super().__init__(max_entries)
+        self.ttl = ttl
+        self.persist_path = persist_path
+
+        if self.persist_path:
+            self.load()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the fresh entry for key, or None on a miss"""
+        now = time.time()
+        entry = super().get(key, None, valid=lambda entry: entry[0] > now)
+        # Callers may annotate the dict, so never hand out the cached object itself
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def get_stale(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the entry for key even if it has expired (outage fallback)"""
+        entry = self.peek(key, None)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """Store a copy of data under key, evicting the least recently used entry if full"""
+        super().put(key, (time.time() + self.ttl, copy.deepcopy(data)))
+
+    def save(self) -> None:
+        """Write unexpired entries to persist_path (atomic replace)"""
+        if not self.persist_path:
+            return
+        now = time.time()
+        snapshot = [[key, expires_at, data] for key, (expires_at, data) in self.items() if expires_at > now]
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.persist_path)
+            print(f"[INFO] Saved {len(snapshot)} cached responses to {self.persist_path}")
+        except OSError as e:
+            print(f"[ERROR] Failed to save response cache: {e}")
+
+    def load(self) -> None:
+        """Load unexpired entries from persist_path, if it exists"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to load response cache: {e}")
+            return
+
+        now = time.time()
+        for key, expires_at, data in snapshot[-self.max_entries:]:
+            if expires_at > now:
+                LRUCache.put(self, key, (expires_at, data))
+        print(f"[INFO] Loaded {len(self._entries)} cached responses from {self.persist_path}")
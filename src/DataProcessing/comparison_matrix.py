@@ -0,0 +1,117 @@
+"""
+Vectorized ranking, colouring and formatting for the multi-city comparison matrix.
+Works on whole columns of a StaticDataQuery.get_best_records frame at once,
+so comparing dozens of cities costs a handful of array operations rather than
+one Python comparison per cell. Colours follow the two-city view: the highest
+temperature is red and the lowest blue, the strongest wind orange and the
+calmest green, missing values gray.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# field -> (colour for the column maximum, colour for the column minimum)
+FIELD_COLORS = {
+    'temp': ("red", "blue"),
+    'feels_like': ("red", "blue"),
+    'speed': ("orange", "green"),
+}
+DEFAULT_COLOR = "white"
+MISSING_COLOR = "gray"
+
+FIELD_LABELS = {
+    'temp': 'Temperature',
+    'feels_like': 'Feels Like',
+    'humidity': 'Humidity (%)',
+    'description': 'Description',
+    'speed': 'Wind Speed (mph)',
+    'dt': 'Last Updated',
+}
+MATRIX_FIELDS = list(FIELD_LABELS)
+RANKED_FIELDS = ['temp', 'feels_like', 'humidity', 'speed']
+
+
+class ComparisonMatrix(NamedTuple):
+    """Aligned frames, one row per city and one column per field"""
+    text: pd.DataFrame      # formatted cell text
+    colors: pd.DataFrame    # colour name per cell
+    ranks: pd.DataFrame     # 1 = highest value for RANKED_FIELDS, NaN otherwise
+
+
+def field_colors(values: pd.Series, field: str) -> np.ndarray:
+    """
+    Colour every value of one field column.
+
+    The column maximum gets the field's "high" colour and the minimum its
+    "low" colour; everything else is white. Missing values, and columns with
+    fewer than two values to compare, are gray.
+    """
+    present = values.notna().to_numpy()
+    colors = np.full(len(present), DEFAULT_COLOR, dtype=object)
+    colors[~present] = MISSING_COLOR
+    if present.sum() < 2:
+        colors[:] = MISSING_COLOR
+        return colors
+    if field in FIELD_COLORS:
+        high, low = FIELD_COLORS[field]
+        numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+        if not np.isnan(numeric).all():
+            top, bottom = np.nanmax(numeric), np.nanmin(numeric)
+            if top != bottom:
+                colors[numeric == top] = high
+                colors[numeric == bottom] = low
+    return colors
+
+
+def format_column(values: pd.Series, field: str, unit_symbol: str) -> pd.Series:
+    """Format a field column for display, "N/A" for missing values"""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if field in ('temp', 'feels_like'):
+        text = numeric.map("{:.1f}".format, na_action="ignore") + unit_symbol
+    elif field == 'humidity':
+        text = numeric.map("{:.0f}%".format, na_action="ignore")
+    elif field == 'speed':
+        text = numeric.map("{:.1f} mph".format, na_action="ignore")
+    else:
+        return values.astype(object).where(values.notna(), "N/A").astype(str)
+    return text.where(numeric.notna(), "N/A")
+
+
+def build_matrix(records: pd.DataFrame, unit_symbol: str = "°F",
+                 fields: Optional[List[str]] = None, sort_by: Optional[str] = None) -> ComparisonMatrix:
+    """
+    Build the comparison matrix for a get_best_records frame.
+
+    Args:
+        records (pd.DataFrame): One row per city, indexed by city name
+        unit_symbol (str): Temperature unit suffix
+        fields (list): Columns to include (defaults to MATRIX_FIELDS)
+        sort_by (str): Optional numeric field to order cities by, highest first (missing last)
+
+    Returns:
+        ComparisonMatrix: text, colors and ranks frames with identical index and columns
+    """
+    fields = fields or MATRIX_FIELDS
+    if sort_by:
+        order = pd.to_numeric(records[sort_by], errors="coerce").sort_values(ascending=False, na_position="last")
+        records = records.loc[order.index]
+
+    text: Dict[str, pd.Series] = {}
+    colors: Dict[str, np.ndarray] = {}
+    ranks: Dict[str, pd.Series] = {}
+    for field in fields:
+        column = records[field] if field in records else pd.Series(np.nan, index=records.index)
+        text[field] = format_column(column, field, unit_symbol)
+        colors[field] = field_colors(column, field)
+        if field in RANKED_FIELDS:
+            ranks[field] = pd.to_numeric(column, errors="coerce").rank(ascending=False, method="min")
+        else:
+            ranks[field] = pd.Series(np.nan, index=records.index)
+
+    return ComparisonMatrix(
+        text=pd.DataFrame(text, index=records.index),
+        colors=pd.DataFrame(colors, index=records.index),
+        ranks=pd.DataFrame(ranks, index=records.index),
+    )
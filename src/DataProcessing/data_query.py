@@ -1,35 +1,120 @@
 # src/DataProcessing/data_query.py
 
-import sqlite3
-import pandas as pd
-from typing import Optional
+from src.DataProcessing import sqlite_profile
+from src.DataProcessing.migrations import LATEST_WEATHER_COLUMNS, LATEST_WEATHER_VERSION, get_version
+from typing import Any, Iterable, NamedTuple, Optional
 
-def fetch_last_data_entry(city: str, db_path: str = "weather_data.db") -> Optional[pd.Series]:
+
+class WeatherRecord(NamedTuple):
+    """
+    One weather row, built straight from a sqlite3 cursor.
+
+    Supports the lookups callers used on the pandas Series it replaces:
+    record.temp, record["temp"] and record.get("temp", default).
+    """
+    id: Optional[int]
+    name: Optional[str]
+    temp: Optional[float]
+    feels_like: Optional[float]
+    humidity: Optional[int]
+    description: Optional[str]
+    speed: Optional[float]
+    dt: Optional[str]
+    dt_epoch: Optional[int]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+
+def _query_latest(conn, latest_query: str, history_query: str, params=()) -> Optional[WeatherRecord]:
+    """
+    Run a single-row query against the latest_weather table (one row per city,
+    kept current by triggers), falling back to scanning weather history on
+    databases whose latest_weather migration has not finished yet.
+    """
+    seeded = get_version(conn) >= LATEST_WEATHER_VERSION
+    row = conn.execute(latest_query if seeded else history_query, params).fetchone()
+    return WeatherRecord._make(row) if row is not None else None
+
+
+def query_last_entry(conn, city: str) -> Optional[WeatherRecord]:
+    """Latest row for city on an open connection (see fetch_last_data_entry)"""
+    return _query_latest(
+        conn,
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM latest_weather WHERE name = ?",
+        f"""
+        SELECT {LATEST_WEATHER_COLUMNS} FROM weather
+        WHERE name = ?
+        ORDER BY dt_epoch DESC
+        LIMIT 1
+        """,
+        (city,),
+    )
+
+
+def query_most_recent_entry(conn) -> Optional[WeatherRecord]:
+    """Newest row across all cities on an open connection (see fetch_most_recent_entry)"""
+    return _query_latest(
+        conn,
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM latest_weather ORDER BY dt_epoch DESC LIMIT 1",
+        f"SELECT {LATEST_WEATHER_COLUMNS} FROM weather ORDER BY dt_epoch DESC LIMIT 1",
+    )
+
+
+def fetch_last_data_entry(city: str, db_path: str = "weather_data.db") -> Optional[WeatherRecord]:
     """
     Fetch the most recent weather entry for a given city from the SQLite database.
-    
+
     Parameters:
         city (str): The name of the city to search for.
         db_path (str): Path to the SQLite database file.
-        
+
     Returns:
-        pd.Series: The most recent row as a pandas Series, or None if not found.
+        WeatherRecord: The most recent row, or None if not found.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        query = """
-            SELECT * FROM weather
-            WHERE name = ?
-            ORDER BY dt DESC
-            LIMIT 1
-        """
-        df = pd.read_sql_query(query, conn, params=(city,))
-        conn.close()
-
-        if not df.empty:
-            return df.iloc[0]
-        else:
-            return None
+        conn = sqlite_profile.connect(db_path, read_only=True)
+        try:
+            return query_last_entry(conn, city)
+        finally:
+            conn.close()
     except Exception as e:
         print(f"Error fetching data for {city}: {e}")
         return None
+
+
+def fetch_most_recent_entry(db_path: str = "weather_data.db") -> Optional[WeatherRecord]:
+    """
+    Fetch the newest weather entry across all cities (i.e. the last city searched).
+
+    Parameters:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        WeatherRecord: The most recent row, or None if the database is empty.
+    """
+    try:
+        conn = sqlite_profile.connect(db_path, read_only=True)
+        try:
+            return query_most_recent_entry(conn)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Error fetching most recent weather entry: {e}")
+        return None
+
+
+def records_to_dataframe(records: Iterable[WeatherRecord]):
+    """
+    Convert WeatherRecords to a pandas DataFrame for bulk analysis.
+    pandas is imported here so single-row lookups never pay for it.
+    """
+    import pandas as pd
+    return pd.DataFrame.from_records(list(records), columns=list(WeatherRecord._fields))
@@ -1,12 +1,53 @@
-import requests
-import sqlite3
 import os
+import threading
 from dotenv import load_dotenv
 from datetime import datetime
 from pathlib import Path
+from src.DataProcessing import migrations, sqlite_profile
+from src.DataProcessing.data_query import query_last_entry, query_most_recent_entry
+from src.API.response_cache import MISSING, LRUCache
+from src.DataProcessing.write_behind import WriteBehindQueue
 
 class WeatherDB:
-    def __init__(self, db_path=None):
+    # Kept as a constant so sqlite3's statement cache reuses the prepared INSERT.
+    # Re-fetching a city inside OWM's refresh window returns the same observation
+    # time; the upsert refreshes that row instead of storing a duplicate
+    INSERT_SQL = """
+        INSERT INTO weather (name, temp, feels_like, humidity, description, speed, dt, dt_epoch)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (name, dt_epoch) DO UPDATE SET
+            temp = excluded.temp,
+            feels_like = excluded.feels_like,
+            humidity = excluded.humidity,
+            description = excluded.description,
+            speed = excluded.speed,
+            dt = excluded.dt
+    """
+
+    # Used until the v4 migration adds the unique (name, dt_epoch) index the upsert
+    # targets; once the index exists, REPLACE keeps one row per observation too
+    LEGACY_INSERT_SQL = """
+        INSERT OR REPLACE INTO weather (name, temp, feels_like, humidity, description, speed, dt, dt_epoch)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    COLUMNS = migrations.WEATHER_COLUMNS
+
+    # Cache key for get_most_recent(); a tuple can't collide with a city name
+    MOST_RECENT_KEY = ("most_recent",)
+
+    def __init__(self, db_path=None, profile=None, queue_size=None, write_batch_size=None, latest_cache_size=None,
+                 migration_progress=None):
+        """
+        Args:
+            db_path (str): SQLite file (defaults to Data/weather_data.db)
+            profile (str): sqlite_profile name (defaults to SQLITE_PROFILE or "performance")
+            queue_size (int): Max records waiting in the write-behind queue (WEATHER_DB_QUEUE_SIZE, default 1000)
+            write_batch_size (int): Max records per background transaction (WEATHER_DB_WRITE_BATCH, default 100)
+            latest_cache_size (int): Cities kept in the latest-observation cache (WEATHER_DB_LATEST_CACHE, default 128)
+            migration_progress (callable): Receives schema upgrade progress messages; called
+                from the background migration thread (defaults to [INFO] prints)
+        """
         if db_path is None:
             # Automatically find the Data folder
             project_root = Path(__file__).parent.parent.parent  # Go up from src/DataProcessing/
@@ -15,151 +56,162 @@ class WeatherDB:
             self.db_path = str(data_folder / "weather_data.db")
         else:
             self.db_path = db_path
-            
+
+        # Ensure the directory exists
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        # One long-lived connection shared by all callers; the lock serializes
+        # access so it can be used from the GUI thread and worker threads alike
+        self._lock = threading.RLock()
+        self._conn = sqlite_profile.connect(self.db_path, profile, check_same_thread=False)
+
+        # Write-behind queue for enqueue(); the writer thread starts on first use
+        self.queue_size = queue_size or int(os.getenv("WEATHER_DB_QUEUE_SIZE", "1000"))
+        self.write_batch_size = write_batch_size or int(os.getenv("WEATHER_DB_WRITE_BATCH", "100"))
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+        # Latest observation per city, read through and invalidated on every write
+        self.latest_cache = LRUCache(
+            latest_cache_size or int(os.getenv("WEATHER_DB_LATEST_CACHE", "128"))
+        )
+
+        # Data-moving schema migrations run here in the background on large databases
+        self.migration_progress = migration_progress or (lambda message: print(f"[INFO] {message}"))
+        self.migration_status = ""
+        self._migration_thread = None
+        self._stop_migrations = threading.Event()
+        self._upsert_ready = False
+
         self._ensure_database_exists()
         print(f"[INFO] Using database at: {os.path.abspath(self.db_path)}")
 
     def _ensure_database_exists(self):
-        """Create the database and table if they don't exist, handle migration"""
+        """
+        Create the database and table if they don't exist and apply pending schema migrations.
+
+        The schema-only steps run here. The data-moving ones (timestamp backfill,
+        duplicate compaction, latest_weather seeding) run on a background thread
+        when the table already holds rows, resuming from the stored schema
+        version; until they finish, reads use the weather history and writes a
+        plain insert.
+        """
         try:
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if table exists and get its current structure
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='weather'")
-            table_exists = cursor.fetchone() is not None
-            
-            if table_exists:
-                # Get current column info
-                cursor.execute("PRAGMA table_info(weather)")
-                columns = [row[1] for row in cursor.fetchall()]
-                print(f"[DEBUG] Current table columns: {columns}")
-                
-                # Check if we need to migrate to new column order
-                expected_order = ['id', 'name', 'temp', 'feels_like', 'humidity', 'description', 'speed', 'dt']
-                
-                if columns != expected_order:
-                    print("[INFO] Migrating database to new column order...")
-                    self._migrate_table_structure(cursor)
-                else:
-                    print("[INFO] Database structure is already up to date")
-            else:
-                # Create new table with correct structure
-                print("[INFO] Creating new weather table with OpenWeatherMap field order...")
-                cursor.execute("""
-                    CREATE TABLE weather (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT,
-                        temp REAL,
-                        feels_like REAL,
-                        humidity INTEGER,
-                        description TEXT,
-                        speed REAL,
-                        dt TEXT
+            version = migrations.migrate(self._conn, lock=self._lock, progress=self._report_migration,
+                                         target=migrations.BLOCKING_VERSION)
+            latest = migrations.WEATHER_MIGRATIONS[-1].version
+            if version < latest:
+                with self._lock:
+                    has_rows = self._conn.execute("SELECT 1 FROM weather LIMIT 1").fetchone() is not None
+                if has_rows:
+                    self._migration_thread = threading.Thread(
+                        target=self._run_migrations, name="weather-db-migrations", daemon=True
                     )
-                """)
-            
-            conn.commit()
-            conn.close()
-            print(f"[INFO] Database initialized successfully")
+                    self._migration_thread.start()
+                    print(f"[INFO] Database at schema version {version}; upgrading to {latest} in the background")
+                    return
+                version = migrations.migrate(self._conn, lock=self._lock, progress=self._report_migration)
+            print(f"[INFO] Database initialized successfully (schema version {version})")
         except Exception as e:
             print(f"[ERROR] Failed to initialize database: {e}")
             raise
 
-    def _migrate_table_structure(self, cursor):
-        """Migrate existing table to new column order"""
+    def _report_migration(self, message):
+        """Progress hook for migrations; also where close() interrupts a background upgrade"""
+        if self._stop_migrations.is_set():
+            raise migrations.MigrationInterrupted()
+        self.migration_status = message
+        self.migration_progress(message)
+
+    def _run_migrations(self):
         try:
-            # Create new table with correct structure
-            cursor.execute("""
-                CREATE TABLE weather_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT,
-                    temp REAL,
-                    feels_like REAL,
-                    humidity INTEGER,
-                    description TEXT,
-                    speed REAL,
-                    dt TEXT
-                )
-            """)
-            
-            # Copy data from old table to new table
-            # Handle the case where feels_like might not exist in old table
-            cursor.execute("PRAGMA table_info(weather)")
-            old_columns = [row[1] for row in cursor.fetchall()]
-            
-            if 'feels_like' in old_columns:
-                # Old table has feels_like, copy all data
-                cursor.execute("""
-                    INSERT INTO weather_new (id, name, temp, feels_like, humidity, description, speed, dt)
-                    SELECT id, name, temp, feels_like, humidity, description, speed, dt
-                    FROM weather
-                """)
-            else:
-                # Old table doesn't have feels_like, set it to NULL
-                cursor.execute("""
-                    INSERT INTO weather_new (id, name, temp, feels_like, humidity, description, speed, dt)
-                    SELECT id, name, temp, NULL, humidity, description, speed, dt
-                    FROM weather
-                """)
-            
-            # Drop old table and rename new one
-            cursor.execute("DROP TABLE weather")
-            cursor.execute("ALTER TABLE weather_new RENAME TO weather")
-            
-            print("[INFO] Database migration completed successfully")
-            
+            version = migrations.migrate(self._conn, lock=self._lock, progress=self._report_migration)
+        except migrations.MigrationInterrupted:
+            print("[INFO] Database upgrade paused; it resumes on the next launch")
+            return
         except Exception as e:
-            print(f"[ERROR] Database migration failed: {e}")
-            # If migration fails, try to clean up
-            cursor.execute("DROP TABLE IF EXISTS weather_new")
-            raise
+            self.migration_status = f"Database upgrade failed: {e}"
+            print(f"[ERROR] Background database upgrade failed: {e}")
+            return
+        self.latest_cache.clear()
+        self.migration_status = ""
+        self.migration_progress(f"Database upgrade complete (schema version {version})")
+
+    def migrating(self):
+        """True while a background schema upgrade is running"""
+        return self._migration_thread is not None and self._migration_thread.is_alive()
+
+    def wait_for_migrations(self, timeout=None):
+        """
+        Block until the background schema upgrade (if any) has finished.
+
+        Returns:
+            bool: True if no upgrade is running any more
+        """
+        if self._migration_thread is not None:
+            self._migration_thread.join(timeout)
+        return not self.migrating()
+
+    def _insert_sql(self):
+        """INSERT_SQL once the unique index exists, LEGACY_INSERT_SQL before (call with self._lock held)"""
+        if not self._upsert_ready:
+            self._upsert_ready = migrations.get_version(self._conn) >= migrations.UPSERT_VERSION
+        return self.INSERT_SQL if self._upsert_ready else self.LEGACY_INSERT_SQL
+
+    def migrate_dt_to_epoch(self, chunk_size=5000):
+        """
+        Backfill dt_epoch from the text dt column in chunks.
+
+        Returns:
+            int: Number of rows converted
+        """
+        return migrations.backfill_dt_epoch(self._conn, self._lock, chunk_size)
+
+    def compact_duplicates(self, chunk_size=5000):
+        """
+        Remove repeated rows for the same city and observation time, keeping
+        the latest copy. Runs once as a schema migration; safe to call again.
+
+        Returns:
+            int: Number of rows deleted
+        """
+        deleted = migrations.compact_duplicates(self._conn, self._lock, chunk_size)
+        self.latest_cache.clear()
+        return deleted
+
+    def _map_record(self, data):
+        """
+        Map an OpenWeatherMap API response to a weather row, in INSERT_SQL column order.
+        """
+        dt_epoch = int(data["dt"])
+        return (
+            data.get("name"),                              # city name
+            data["main"]["temp"],                          # temperature
+            data["main"].get("feels_like"),                # feels like temperature
+            data["main"]["humidity"],                      # humidity
+            data["weather"][0]["description"],             # weather description
+            data["wind"]["speed"],                         # wind speed
+            datetime.utcfromtimestamp(dt_epoch).strftime("%Y-%m-%d %H:%M:%S"),  # observation time from OWM
+            dt_epoch                                       # same time as Unix seconds
+        )
 
     def save_weather_to_sqlite(self, data):
         """
         Save OpenWeatherMap API data to SQLite following OpenWeatherMap field order.
         """
         # Map OWM fields in OpenWeatherMap order
-        record = {
-            "name": data.get("name"),                              # city name
-            "temp": data["main"]["temp"],                          # temperature
-            "feels_like": data["main"].get("feels_like"),          # feels like temperature
-            "humidity": data["main"]["humidity"],                  # humidity
-            "description": data["weather"][0]["description"],      # weather description
-            "speed": data["wind"]["speed"],                        # wind speed
-            "dt": datetime.utcfromtimestamp(data["dt"]).strftime("%Y-%m-%d %H:%M:%S")  # observation time from OWM
-        }
+        record = self._map_record(data)
 
         try:
-            # Connect to DB
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Verify table structure before inserting
-            cursor.execute("PRAGMA table_info(weather)")
-            columns = [row[1] for row in cursor.fetchall()]
-            print(f"[DEBUG] Table structure before insert: {columns}")
-
             # Insert record following OpenWeatherMap field order
-            cursor.execute("""
-                INSERT INTO weather (name, temp, feels_like, humidity, description, speed, dt)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                record["name"],
-                record["temp"],
-                record["feels_like"],
-                record["humidity"],
-                record["description"],
-                record["speed"],
-                record["dt"]
-            ))
-
-            conn.commit()
-            conn.close()
-            print(f"Weather for {record['name']} saved to SQLite.")
+            with self._lock:
+                try:
+                    self._conn.execute(self._insert_sql(), record)
+                    self._conn.commit()
+                finally:
+                    self._invalidate_latest([record[0]])
+            print(f"Weather for {record[0]} saved to SQLite.")
         except Exception as e:
             print(f"[ERROR] Failed to save weather data: {e}")
             print(f"[DEBUG] Record data: {record}")
@@ -167,4 +219,162 @@ class WeatherDB:
 
     def save(self, data):
         """Alias for save_weather_to_sqlite for convenience"""
-        return self.save_weather_to_sqlite(data)
\ No newline at end of file
+        return self.save_weather_to_sqlite(data)
+
+    def save_many(self, records, chunk_size=None):
+        """
+        Save a batch of OpenWeatherMap API responses with executemany.
+
+        Records that fail validation (missing fields) are skipped and reported.
+        Each chunk is inserted in a single transaction; by default the whole
+        batch is one chunk, so a poll cycle costs one commit.
+
+        Args:
+            records (iterable): OpenWeatherMap API response dicts
+            chunk_size (int): Optional max rows per transaction
+
+        Returns:
+            int: Number of rows inserted
+        """
+        rows = []
+        for data in records:
+            try:
+                rows.append(self._map_record(data))
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                name = data.get("name") if isinstance(data, dict) else None
+                print(f"[ERROR] Skipping invalid weather record for {name!r}: {e!r}")
+
+        if not rows:
+            return 0
+
+        size = chunk_size or len(rows)
+        try:
+            with self._lock:
+                try:
+                    insert_sql = self._insert_sql()
+                    for start in range(0, len(rows), size):
+                        with self._conn:  # one transaction per chunk
+                            self._conn.executemany(insert_sql, rows[start:start + size])
+                finally:
+                    self._invalidate_latest({row[0] for row in rows})
+            print(f"[INFO] Saved {len(rows)} weather records to SQLite.")
+            return len(rows)
+        except Exception as e:
+            print(f"[ERROR] Failed to save weather batch: {e}")
+            raise
+
+    def _invalidate_latest(self, cities):
+        """Drop cached latest rows for cities just written (call with self._lock held)"""
+        self.latest_cache.invalidate(list(cities) + [self.MOST_RECENT_KEY])
+
+    def _read_latest(self, key, query):
+        """
+        Cached read of one latest-observation query.
+
+        Entries are stamped with PRAGMA data_version, which moves whenever
+        another connection or process commits, so their writes are picked up
+        too; writes through this instance invalidate the cities they touch.
+        """
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            entry = self.latest_cache.get(key, valid=lambda entry: entry[0] == version)
+            if entry is not MISSING:
+                return entry[1]
+            # Filled under the write lock so a concurrent write can't be
+            # overwritten by the older row read here
+            record = query()
+            self.latest_cache.put(key, (version, record))
+        return record
+
+    def get_latest(self, city):
+        """
+        Latest stored observation for a city, served from memory until the data changes.
+
+        Returns:
+            WeatherRecord: The newest row for city, or None if it has no data
+        """
+        return self._read_latest(city, lambda: query_last_entry(self._conn, city))
+
+    def get_most_recent(self):
+        """
+        Newest stored observation across all cities (the last city searched), cached like get_latest.
+
+        Returns:
+            WeatherRecord: The newest row, or None if the database is empty
+        """
+        return self._read_latest(self.MOST_RECENT_KEY, lambda: query_most_recent_entry(self._conn))
+
+    def enqueue(self, data, timeout=None):
+        """
+        Queue an OpenWeatherMap API response for a background write and return immediately.
+
+        The writer thread saves queued records in batches (one transaction per
+        batch). When the queue is full the caller blocks until there is room.
+
+        Args:
+            data (dict): OpenWeatherMap API response
+            timeout (float): Max seconds to wait for room; None waits indefinitely
+
+        Raises:
+            queue.Full: If timeout expires while the queue is full
+            RuntimeError: If the database has been closed
+        """
+        with self._writer_lock:
+            if self._closed:
+                raise RuntimeError("weather database is closed")
+            if self._writer is None:
+                self._writer = WriteBehindQueue(
+                    self.save_many,
+                    max_size=self.queue_size,
+                    batch_size=self.write_batch_size,
+                    name="weather-db-writer",
+                )
+            # close() may clear self._writer as soon as the lock is released
+            writer = self._writer
+        writer.put(data, timeout=timeout)
+
+    def pending_writes(self):
+        """Records queued with enqueue() that are not yet committed"""
+        return self._writer.pending() if self._writer else 0
+
+    def flush(self, timeout=None):
+        """
+        Block until every enqueued record has been written.
+
+        Returns:
+            bool: True if the queue drained before the timeout
+        """
+        return self._writer.flush(timeout) if self._writer else True
+
+    def writer_stats(self):
+        """Write-behind metrics: queue depth, records written/failed, commit latency"""
+        if self._writer is None:
+            return {'depth': 0, 'max_size': self.queue_size, 'pending': 0, 'enqueued': 0,
+                    'written': 0, 'failed': 0, 'batches': 0, 'blocked_puts': 0,
+                    'last_commit_ms': 0.0, 'avg_commit_ms': 0.0, 'max_commit_ms': 0.0}
+        return self._writer.stats()
+
+    def close(self):
+        """
+        Write any queued records, stop the writer and close the shared database connection.
+        A running background upgrade stops after its current chunk and resumes on the next launch.
+        """
+        self._stop_migrations.set()
+        if self._migration_thread is not None:
+            self._migration_thread.join()
+        with self._writer_lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            if not writer.close():
+                print(f"[ERROR] {writer.pending()} queued weather records were not written")
+            stats = writer.stats()
+            print(f"[INFO] Background writer stopped: {stats['written']} written, {stats['failed']} failed")
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,416 @@
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+# Layout of the weather table as of the latest migration. dt stays as readable
+# UTC text for display/CSV export; dt_epoch (Unix seconds) is the column to
+# sort, range-filter and index on
+WEATHER_COLUMNS = ['id', 'name', 'temp', 'feels_like', 'humidity', 'description', 'speed', 'dt', 'dt_epoch']
+WEATHER_TABLE_SQL = """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT,
+        temp REAL,
+        feels_like REAL,
+        humidity INTEGER,
+        description TEXT,
+        speed REAL,
+        dt TEXT,
+        dt_epoch INTEGER
+    )
+"""
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Migrations up to BLOCKING_VERSION are schema-only and run before the database
+# is used; the data-moving steps after it can run in the background
+BLOCKING_VERSION = 2
+# First version with the unique (name, dt_epoch) index the upsert needs
+UPSERT_VERSION = 4
+# First version with a fully seeded latest_weather table
+LATEST_WEATHER_VERSION = 5
+
+
+class MigrationInterrupted(Exception):
+    """Raised from a progress callback to stop a migration between chunks"""
+
+
+class Migration(NamedTuple):
+    """
+    One schema step. apply(conn, lock, chunk_size, progress) must be safe to
+    re-run: if the app stops mid-migration, user_version is not bumped and the
+    step starts again on the next launch, picking up where it left off.
+    """
+    version: int
+    description: str
+    apply: Callable
+
+
+def get_version(conn) -> int:
+    """Read the schema version stored in the database header (0 for a new/legacy file)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _set_version(conn, version: int) -> None:
+    # PRAGMA does not accept bound parameters; version is always an int from MIGRATIONS
+    conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def _print_progress(message: str) -> None:
+    print(f"[INFO] {message}")
+
+
+def _table_columns(conn, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def copy_table_in_batches(conn, lock, source: str, target: str, columns: List[str],
+                          chunk_size: int = DEFAULT_CHUNK_SIZE, progress=_print_progress) -> int:
+    """
+    Copy source into target (which must already exist) in id order, one short
+    transaction per chunk. Columns missing from source are filled with NULL.
+
+    Rows already present in target are skipped, so an interrupted copy resumes
+    from the last committed chunk instead of starting over.
+
+    Returns:
+        int: Number of rows copied by this call
+    """
+    source_columns = _table_columns(conn, source)
+    # Tables without an id column are keyed by their implicit rowid
+    key = "id" if "id" in source_columns else "rowid"
+    select_list = ", ".join(
+        col if col in source_columns else ("rowid" if col == "id" else "NULL")
+        for col in columns
+    )
+    total = conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+    done = conn.execute(f"SELECT COUNT(*) FROM {target}").fetchone()[0]
+    copied = 0
+
+    while True:
+        with lock, conn:
+            last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {target}").fetchone()[0]
+            cursor = conn.execute(f"""
+                INSERT INTO {target} ({", ".join(columns)})
+                SELECT {select_list} FROM {source}
+                WHERE {key} > ? ORDER BY {key} LIMIT ?
+            """, (last_id, chunk_size))
+        if cursor.rowcount <= 0:
+            break
+        copied += cursor.rowcount
+        done += cursor.rowcount
+        progress(f"Copied {done}/{total} rows from {source} to {target}...")
+    return copied
+
+
+def backfill_dt_epoch(conn, lock, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=_print_progress) -> int:
+    """
+    Backfill weather.dt_epoch from the text dt column in chunks.
+
+    Each chunk is its own short transaction and the lock is released in
+    between, so other writers keep working while a large database converts.
+
+    Returns:
+        int: Number of rows converted
+    """
+    converted = 0
+    last_id = 0
+    while True:
+        with lock, conn:
+            ids = [row[0] for row in conn.execute("""
+                SELECT id FROM weather
+                WHERE dt_epoch IS NULL AND dt IS NOT NULL AND id > ?
+                ORDER BY id LIMIT ?
+            """, (last_id, chunk_size))]
+            if not ids:
+                break
+            conn.execute("""
+                UPDATE weather SET dt_epoch = CAST(strftime('%s', dt) AS INTEGER)
+                WHERE id BETWEEN ? AND ? AND dt_epoch IS NULL
+            """, (ids[0], ids[-1]))
+        last_id = ids[-1]
+        converted += len(ids)
+        progress(f"Converted {converted} weather timestamps to epoch seconds...")
+    return converted
+
+
+def compact_duplicates(conn, lock, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=_print_progress) -> int:
+    """
+    Delete repeated weather rows for the same city and observation time,
+    keeping the most recently inserted copy (highest id).
+
+    Walks the table in id windows of chunk_size, one short transaction each,
+    so the job can be run on a large database without blocking writers.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    deleted = 0
+    last_id = 0
+    while True:
+        with lock, conn:
+            window = conn.execute(
+                "SELECT MIN(id), MAX(id) FROM (SELECT id FROM weather WHERE id > ? ORDER BY id LIMIT ?)",
+                (last_id, chunk_size),
+            ).fetchone()
+            if window[0] is None:
+                break
+            cursor = conn.execute("""
+                DELETE FROM weather
+                WHERE id BETWEEN ? AND ? AND dt_epoch IS NOT NULL
+                  AND EXISTS (
+                      SELECT 1 FROM weather newer
+                      WHERE newer.name = weather.name
+                        AND newer.dt_epoch = weather.dt_epoch
+                        AND newer.id > weather.id
+                  )
+            """, window)
+        last_id = window[1]
+        deleted += max(cursor.rowcount, 0)
+        progress(f"Compacted weather rows up to id {last_id}: {deleted} duplicates removed...")
+    return deleted
+
+
+def _replace_table(conn, table: str, replacement: str) -> None:
+    """
+    Drop table (if present) and rename replacement into its place atomically.
+
+    sqlite3 runs DDL outside any implicit transaction, so each statement would
+    otherwise commit on its own; an explicit BEGIN keeps the pair all-or-nothing.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"ALTER TABLE {replacement} RENAME TO {table}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+# --- weather database migrations -------------------------------------------
+
+def _v1_weather_table(conn, lock, chunk_size, progress):
+    """Create the weather table, or bring a pre-versioning table to the current layout"""
+    with lock:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='weather'"
+        ).fetchone() is not None
+        if not exists:
+            copied = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='weather_new'"
+            ).fetchone() is not None
+            if copied:
+                # An earlier run finished the copy and dropped weather but stopped
+                # before the rename; weather_new holds every row
+                progress("Finishing interrupted weather table migration...")
+                _replace_table(conn, "weather", "weather_new")
+                return
+            progress("Creating new weather table with OpenWeatherMap field order...")
+            with conn:
+                conn.execute(WEATHER_TABLE_SQL.format(table="weather"))
+            return
+
+        columns = _table_columns(conn, "weather")
+        if columns == WEATHER_COLUMNS:
+            return
+        if columns == WEATHER_COLUMNS[:-1]:
+            # Text-only timestamps: add the epoch column in place, backfilled in v3
+            progress("Adding integer dt_epoch column to weather table...")
+            with conn:
+                conn.execute("ALTER TABLE weather ADD COLUMN dt_epoch INTEGER")
+            return
+
+        progress(f"Migrating weather table from columns {columns} to the current layout...")
+        with conn:
+            # A weather_new left by an interrupted run is kept and resumed
+            conn.execute(WEATHER_TABLE_SQL.format(table="weather_new").replace(
+                "CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+
+    copy_table_in_batches(conn, lock, "weather", "weather_new", WEATHER_COLUMNS, chunk_size, progress)
+
+    with lock:
+        _replace_table(conn, "weather", "weather_new")
+    progress("Weather table migration completed successfully")
+
+
+def _v2_epoch_indexes(conn, lock, chunk_size, progress):
+    """
+    Indexes behind the hot read paths:
+    - (name, dt_epoch): latest entry for a city (WHERE name = ? ORDER BY dt_epoch DESC LIMIT 1)
+    - (dt_epoch): most recent entries / time ranges across all cities
+    """
+    with lock, conn:
+        # Superseded text-timestamp indexes
+        conn.execute("DROP INDEX IF EXISTS idx_weather_name_dt")
+        conn.execute("DROP INDEX IF EXISTS idx_weather_dt")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_weather_name_dt_epoch ON weather (name, dt_epoch)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_weather_dt_epoch ON weather (dt_epoch)")
+
+
+def _v3_backfill_dt_epoch(conn, lock, chunk_size, progress):
+    backfill_dt_epoch(conn, lock, chunk_size, progress)
+
+
+def _v4_unique_observations(conn, lock, chunk_size, progress):
+    """
+    One row per (city, observation time): drop existing duplicates, then
+    enforce it with a UNIQUE index that WeatherDB's upsert targets. The unique
+    index also serves the latest-entry lookup, so the plain one is dropped.
+    """
+    with lock:
+        covered = conn.execute("SELECT COALESCE(MAX(id), 0) FROM weather").fetchone()[0]
+    compact_duplicates(conn, lock, chunk_size, progress)
+    with lock, conn:
+        # Writers keep inserting while the compaction walks the table; drop the
+        # older copies of anything they added before the index makes it impossible
+        conn.execute("""
+            DELETE FROM weather WHERE id IN (
+                SELECT older.id FROM weather newer
+                JOIN weather older ON older.name = newer.name AND older.dt_epoch = newer.dt_epoch
+                    AND older.id < newer.id
+                WHERE newer.id > ?
+            )
+        """, (covered,))
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_weather_name_dt_epoch ON weather (name, dt_epoch)")
+        conn.execute("DROP INDEX IF EXISTS idx_weather_name_dt_epoch")
+
+
+LATEST_WEATHER_COLUMNS = "id, name, temp, feels_like, humidity, description, speed, dt, dt_epoch"
+_NEW_ROW = ", ".join(f"NEW.{col.strip()}" for col in LATEST_WEATHER_COLUMNS.split(","))
+_UPSERT_LATEST = f"""
+    INSERT INTO latest_weather ({LATEST_WEATHER_COLUMNS}) VALUES ({_NEW_ROW})
+    ON CONFLICT (name) DO UPDATE SET
+        id = excluded.id, temp = excluded.temp, feels_like = excluded.feels_like,
+        humidity = excluded.humidity, description = excluded.description,
+        speed = excluded.speed, dt = excluded.dt, dt_epoch = excluded.dt_epoch
+    WHERE latest_weather.dt_epoch IS NULL OR excluded.dt_epoch >= latest_weather.dt_epoch;
+"""
+
+
+def _v5_latest_weather(conn, lock, chunk_size, progress):
+    """
+    latest_weather holds the newest observation per city, kept current by
+    triggers on weather, so "current conditions" reads are a primary-key lookup
+    however much history accumulates.
+    """
+    with lock, conn:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS latest_weather (
+                name TEXT PRIMARY KEY NOT NULL,
+                id INTEGER,
+                temp REAL,
+                feels_like REAL,
+                humidity INTEGER,
+                description TEXT,
+                speed REAL,
+                dt TEXT,
+                dt_epoch INTEGER
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_latest_weather_dt_epoch ON latest_weather (dt_epoch)")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_weather_latest_insert AFTER INSERT ON weather
+            WHEN NEW.name IS NOT NULL
+            BEGIN {_UPSERT_LATEST} END
+        """)
+        # The upsert in WeatherDB.INSERT_SQL updates rows in place
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_weather_latest_update AFTER UPDATE ON weather
+            WHEN NEW.name IS NOT NULL
+            BEGIN {_UPSERT_LATEST} END
+        """)
+        # Deleting the current row (e.g. compaction) falls back to the next newest one
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_weather_latest_delete AFTER DELETE ON weather
+            WHEN EXISTS (SELECT 1 FROM latest_weather WHERE name = OLD.name AND id = OLD.id)
+            BEGIN
+                DELETE FROM latest_weather WHERE name = OLD.name;
+                INSERT INTO latest_weather ({LATEST_WEATHER_COLUMNS})
+                SELECT {LATEST_WEATHER_COLUMNS} FROM weather
+                WHERE name = OLD.name ORDER BY dt_epoch DESC, id DESC LIMIT 1;
+            END
+        """)
+
+    # Seed from existing history a chunk of cities at a time, one (name, dt_epoch)
+    # index probe per city; the triggers keep seeded cities current meanwhile
+    progress("Building latest_weather from existing observations...")
+    select_list = ", ".join(f"w.{col.strip()}" for col in LATEST_WEATHER_COLUMNS.split(","))
+    last_name = ""
+    seeded = 0
+    while True:
+        with lock, conn:
+            names = [row[0] for row in conn.execute(
+                "SELECT DISTINCT name FROM weather WHERE name > ? ORDER BY name LIMIT ?",
+                (last_name, chunk_size),
+            )]
+            if not names:
+                break
+            conn.execute(f"""
+                INSERT OR REPLACE INTO latest_weather ({LATEST_WEATHER_COLUMNS})
+                SELECT {select_list}
+                FROM (SELECT DISTINCT name FROM weather WHERE name BETWEEN ? AND ?) cities
+                JOIN weather w ON w.id = (
+                    SELECT id FROM weather
+                    WHERE name = cities.name ORDER BY dt_epoch DESC, id DESC LIMIT 1
+                )
+            """, (names[0], names[-1]))
+        last_name = names[-1]
+        seeded += len(names)
+        progress(f"Built latest_weather for {seeded} cities...")
+
+
+WEATHER_MIGRATIONS = [
+    Migration(1, "weather table layout", _v1_weather_table),
+    Migration(2, "dt_epoch indexes", _v2_epoch_indexes),
+    Migration(3, "backfill dt_epoch", _v3_backfill_dt_epoch),
+    Migration(4, "unique (name, dt_epoch) observations", _v4_unique_observations),
+    Migration(5, "latest_weather per-city table", _v5_latest_weather),
+]
+
+
+def migrate(conn, migrations: List[Migration] = WEATHER_MIGRATIONS, lock=None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE, progress: Optional[Callable] = None,
+            target: Optional[int] = None) -> int:
+    """
+    Bring a database up to the latest schema version (or to target).
+
+    An up-to-date database costs a single PRAGMA user_version read. Otherwise
+    each pending migration runs in order and user_version is bumped after it
+    completes, so a crash or close mid-way resumes at the unfinished step.
+
+    Data-moving steps commit in chunks and take the lock per chunk, so they can
+    run on a background thread while the same connection serves other callers.
+    A progress callback may raise MigrationInterrupted to stop between chunks.
+
+    Args:
+        conn: sqlite3 connection
+        migrations (list): Migration steps in ascending version order
+        lock: Lock held around each batch (defaults to a private lock)
+        chunk_size (int): Rows per transaction for data-moving steps
+        progress (callable): Receives progress messages (defaults to [INFO] prints)
+        target (int): Stop after this version (defaults to the latest)
+
+    Returns:
+        int: Schema version after migrating
+    """
+    lock = lock or threading.RLock()
+    with lock:
+        current = get_version(conn)
+    latest = migrations[-1].version if migrations else 0
+    if target is not None:
+        latest = min(latest, target)
+    if current >= latest:
+        return current
+
+    progress = progress or _print_progress
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+        if migration.version > latest:
+            break
+        progress(f"Applying schema migration {migration.version}/{migrations[-1].version}: {migration.description}")
+        migration.apply(conn, lock, chunk_size, progress)
+        with lock, conn:
+            _set_version(conn, migration.version)
+        current = migration.version
+    return current
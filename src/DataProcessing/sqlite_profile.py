@@ -0,0 +1,81 @@
+"""
+SQLite connection profiles for the weather database.
+
+The dashboard GUI reads Data/weather_data.db while fetches write to it.
+The "performance" profile switches the file to WAL so readers and the
+writer stop blocking each other, and tunes the per-connection caches.
+Every module that opens the database should go through connect().
+"""
+
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # SQLite's own defaults (rollback journal, FULL sync)
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",        # readers don't block the writer and vice versa
+        "synchronous": "NORMAL",      # safe with WAL; fsync at checkpoints instead of every commit
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,     # negative = KiB, i.e. 64 MiB page cache
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,         # ms to wait on a lock before raising
+    },
+}
+
+# Environment overrides, applied on top of the selected profile
+ENV_OVERRIDES = {
+    "journal_mode": "SQLITE_JOURNAL_MODE",
+    "synchronous": "SQLITE_SYNCHRONOUS",
+    "mmap_size": "SQLITE_MMAP_SIZE",
+    "cache_size": "SQLITE_CACHE_SIZE",
+    "temp_store": "SQLITE_TEMP_STORE",
+    "busy_timeout": "SQLITE_BUSY_TIMEOUT",
+}
+
+# journal_mode is stored in the database file and needs a write to change,
+# so read-only callers leave it to the writer (WeatherDB)
+PERSISTENT_PRAGMAS = {"journal_mode"}
+
+
+def get_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve a profile by name (defaults to SQLITE_PROFILE or "performance"),
+    with any SQLITE_* environment overrides applied.
+    """
+    name = (name or os.getenv("SQLITE_PROFILE", "performance")).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    profile = dict(PROFILES[name])
+    for pragma, env_var in ENV_OVERRIDES.items():
+        value = os.getenv(env_var)
+        if value:
+            profile[pragma] = value
+    return profile
+
+
+def apply_profile(conn: sqlite3.Connection, profile: Optional[str] = None, read_only: bool = False) -> sqlite3.Connection:
+    """Run the profile's PRAGMAs on an open connection"""
+    for pragma, value in get_profile(profile).items():
+        if read_only and pragma in PERSISTENT_PRAGMAS:
+            continue
+        try:
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Could not set PRAGMA {pragma}={value}: {e}")
+    return conn
+
+
+def connect(db_path: str, profile: Optional[str] = None, read_only: bool = False, **kwargs) -> sqlite3.Connection:
+    """
+    sqlite3.connect() with the performance profile applied.
+
+    Args:
+        db_path (str): Database file
+        profile (str): Profile name (defaults to SQLITE_PROFILE or "performance")
+        read_only (bool): Skip PRAGMAs that modify the database file
+        **kwargs: Passed through to sqlite3.connect
+    """
+    conn = sqlite3.connect(db_path, **kwargs)
+    return apply_profile(conn, profile, read_only=read_only)
@@ -1,76 +1,203 @@
 import sqlite3
+import threading
 import pandas as pd
-from typing import Optional, List, Tuple
+from src.DataProcessing import sqlite_profile
+from typing import Any, Callable, Dict, Optional, List, Tuple
+
+def completeness_score_sql(fields: List[str]) -> str:
+    """
+    SQL expression counting how many of fields hold a value: NULLs score 0,
+    text scores 1 only if it is not blank, anything else scores 1.
+    """
+    return " + ".join(
+        f"(CASE WHEN {field} IS NULL THEN 0 WHEN typeof({field}) = 'text' THEN trim({field}) <> '' ELSE 1 END)"
+        for field in fields
+    )
+
+
+STATIC_DATA_FIELDS = ['temp', 'feels_like', 'humidity', 'description', 'speed', 'dt']
+
+
+def ensure_static_data_schema(conn: sqlite3.Connection, table_name: str = "static_data") -> None:
+    """
+    One-time schema step for static_data, run by its loader (weather_data_processor)
+    after a bulk load (idempotent):
+    - (name, dt) index
+    - completeness_score: virtual generated column holding completeness_score_sql
+    - (name, completeness_score DESC, dt DESC) index, so the best record for a
+      city is the first index entry for that name
+
+    Generated columns are part of SELECT *, so readers of the table also see
+    completeness_score. Requires SQLite 3.31+.
+    """
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_name_dt ON {table_name} (name, dt)")
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_xinfo({table_name})")]
+    if "completeness_score" not in columns:
+        conn.execute(f"""
+            ALTER TABLE {table_name} ADD COLUMN completeness_score INTEGER
+            GENERATED ALWAYS AS ({completeness_score_sql(STATIC_DATA_FIELDS)}) VIRTUAL
+        """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{table_name}_name_score_dt
+        ON {table_name} (name, completeness_score DESC, dt DESC)
+    """)
+    conn.commit()
+
 
 class StaticDataQuery:
     """
     Handles all operations on the static_data table in weather_data.db.
     """
 
+    # Cities per statement in get_best_records; stays under the 999 bound-parameter
+    # limit of older SQLite builds
+    MAX_CITIES_PER_QUERY = 500
+
     def __init__(self, db_path: str = "Data/weather_data.db"):
         self.db_path = db_path
         self.table_name = "static_data"
-        self.data_fields = ['temp', 'feels_like', 'humidity', 'description', 'speed', 'dt']
+        self.data_fields = list(STATIC_DATA_FIELDS)
+        self.score_sql = completeness_score_sql(self.data_fields)
+        self.has_score_column = self._detect_score_column()
+
+        # Long-lived read connection for cheap change detection and cached aggregates.
+        # PRAGMA data_version only means something when compared on the same connection
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cache: Dict[str, Tuple[Any, Any]] = {}
+
+    def _detect_score_column(self) -> bool:
+        """
+        True if ensure_static_data_schema has added the completeness_score column.
+        Read-only: without it queries use the inline score_sql expression.
+        """
+        try:
+            conn = sqlite_profile.connect(self.db_path, read_only=True)
+            try:
+                columns = [row[1] for row in conn.execute(f"PRAGMA table_xinfo({self.table_name})")]
+            finally:
+                conn.close()
+            return "completeness_score" in columns
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Could not inspect {self.table_name}: {e}")
+            return False
+
+    def _has_name_index(self, conn: sqlite3.Connection) -> bool:
+        """True if some index on the table starts with the name column"""
+        for index in conn.execute(f"PRAGMA index_list({self.table_name})").fetchall():
+            first = conn.execute(f"PRAGMA index_info({index[1]})").fetchone()
+            if first is not None and first[2] == "name":
+                return True
+        return False
+
+    def _compute_cities(self, conn: sqlite3.Connection) -> Tuple[str, ...]:
+        if not self._has_name_index(conn):
+            # Without the index every skip-scan step would scan the whole table
+            rows = conn.execute(
+                f"SELECT DISTINCT name FROM {self.table_name} WHERE name IS NOT NULL ORDER BY name"
+            ).fetchall()
+            return tuple(row[0] for row in rows)
+
+        # Skip scan over the (name, ...) index: one seek per distinct city
+        # instead of reading every row, so cost tracks the number of cities
+        rows = conn.execute(f"""
+            WITH RECURSIVE cities(name) AS (
+                SELECT MIN(name) FROM {self.table_name}
+                UNION ALL
+                SELECT (SELECT MIN(name) FROM {self.table_name} WHERE name > cities.name)
+                FROM cities WHERE cities.name IS NOT NULL
+            )
+            SELECT name FROM cities WHERE name IS NOT NULL
+        """).fetchall()
+        return tuple(row[0] for row in rows)
 
     def get_all_cities(self) -> List[str]:
+        """
+        Sorted distinct city names, kept in memory and only rebuilt after the data changes.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = f"""
-                SELECT DISTINCT name FROM {self.table_name}
-                WHERE name IS NOT NULL
-                ORDER BY name ASC
-            """
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            if not df.empty:
-                cities = df['name'].tolist()
+            cities = list(self._cached("cities", self._compute_cities))
+            if cities:
                 print(f"[DEBUG] Found {len(cities)} unique cities in static database")
-                return cities
             else:
                 print("[DEBUG] No cities found in static database")
-                return []
+            return cities
         except Exception as e:
             print(f"Error fetching cities from static database: {e}")
             return []
 
-    def _calculate_completeness_score(self, row: pd.Series) -> int:
-        score = 0
-        for field in self.data_fields:
-            if field in row and pd.notna(row[field]) and row[field] is not None:
-                if isinstance(row[field], str) and row[field].strip() != "":
-                    score += 1
-                elif not isinstance(row[field], str):
-                    score += 1
-        return score
+    def _best_records_query(self, conn, cities: List[str]) -> pd.DataFrame:
+        """Best record for each of cities (at most MAX_CITIES_PER_QUERY) in one statement"""
+        # Plain columns only; the generated score column is selected separately
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({self.table_name})")]
+        score = "completeness_score" if self.has_score_column else f"({self.score_sql})"
+        values = ", ".join("(?)" for _ in cities)
+        # One (name, completeness_score DESC, dt DESC) index probe per requested city
+        query = f"""
+            WITH wanted(name) AS (VALUES {values})
+            SELECT {", ".join(f"s.{col}" for col in columns)}, {score} AS completeness_score
+            FROM wanted
+            JOIN {self.table_name} s ON s.id = (
+                SELECT id FROM {self.table_name}
+                WHERE name = wanted.name
+                ORDER BY {score} DESC, dt DESC
+                LIMIT 1
+            )
+        """
+        return pd.read_sql_query(query, conn, params=list(cities))
 
-    def get_best_record_for_city(self, city: str) -> Optional[pd.Series]:
+    def get_best_records(self, cities: List[str]) -> pd.DataFrame:
+        """
+        Return the most complete record (newest first among ties) for every city in one query.
+
+        Args:
+            cities (list): City names to compare
+
+        Returns:
+            pd.DataFrame: One row per requested city, indexed by city name in the
+            order given (duplicates dropped). Cities without data get an all-NaN row.
+        """
+        wanted = list(dict.fromkeys(cities))
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = f"""
-                SELECT * FROM {self.table_name}
-                WHERE name = ?
-            """
-            df = pd.read_sql_query(query, conn, params=(city,))
-            conn.close()
-            if df.empty:
-                print(f"[DEBUG] No records found for city: {city}")
-                return None
-            print(f"[DEBUG] Found {len(df)} records for {city}")
-            df['completeness_score'] = df.apply(self._calculate_completeness_score, axis=1)
-            df_sorted = df.sort_values(['completeness_score', 'dt'], ascending=[False, False])
-            best_score = df_sorted.iloc[0]['completeness_score']
-            print(f"[DEBUG] Selected record for {city} with completeness score: {best_score}/{len(self.data_fields)}")
-            best_record = df_sorted.iloc[0].drop('completeness_score')
-            return best_record
+            conn = sqlite_profile.connect(self.db_path, read_only=True)
+            try:
+                frames = [
+                    self._best_records_query(conn, wanted[start:start + self.MAX_CITIES_PER_QUERY])
+                    for start in range(0, len(wanted), self.MAX_CITIES_PER_QUERY)
+                ]
+            finally:
+                conn.close()
+            found = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            if not found.empty:
+                found = found.drop(columns="completeness_score").set_index("name", drop=False)
+            print(f"[DEBUG] Found best records for {len(found)}/{len(wanted)} cities")
+            result = found.reindex(wanted)
+            result.index.name = None
+            return result
         except Exception as e:
-            print(f"Error fetching best record for {city}: {e}")
+            print(f"Error fetching best records for {len(wanted)} cities: {e}")
+            return pd.DataFrame(index=wanted)
+
+    @staticmethod
+    def _record_for(records: pd.DataFrame, city: str) -> Optional[pd.Series]:
+        """Row for city from a get_best_records frame, or None if the city has no data"""
+        if city not in records.index or records.loc[city].isna().all():
             return None
+        return records.loc[city].rename(None)
+
+    def get_best_record_for_city(self, city: str) -> Optional[pd.Series]:
+        """Return the most complete record for a city (newest first among ties), or None"""
+        record = self._record_for(self.get_best_records([city]), city)
+        if record is None:
+            print(f"[DEBUG] No records found for city: {city}")
+        return record
 
     def get_comparison_data(self, city1: str, city2: str) -> Tuple[Optional[pd.Series], Optional[pd.Series]]:
         try:
             print(f"[DEBUG] Fetching comparison data for {city1} vs {city2}")
-            data1 = self.get_best_record_for_city(city1)
-            data2 = self.get_best_record_for_city(city2)
+            records = self.get_best_records([city1, city2])
+            data1 = self._record_for(records, city1)
+            data2 = self._record_for(records, city2)
             if data1 is not None and data2 is not None:
                 print(f"[DEBUG] Successfully retrieved data for both cities")
             elif data1 is None:
@@ -84,37 +211,59 @@ class StaticDataQuery:
 
     def get_city_count(self) -> int:
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = f"""
-                SELECT COUNT(DISTINCT name) as city_count FROM {self.table_name}
-                WHERE name IS NOT NULL
-            """
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df.iloc[0]['city_count'] if not df.empty else 0
+            # Served from the cached aggregate pass
+            return self._cached("database_stats", self._compute_database_stats)['unique_cities']
         except Exception as e:
             print(f"Error getting city count: {e}")
             return 0
 
+    def _connection(self) -> sqlite3.Connection:
+        """The shared read connection (call with self._lock held)"""
+        if self._conn is None:
+            self._conn = sqlite_profile.connect(self.db_path, read_only=True, check_same_thread=False)
+        return self._conn
+
+    def change_token(self) -> Tuple[int, int]:
+        """
+        Token that changes whenever the database changes: PRAGMA data_version moves
+        when another connection commits, total_changes when this one writes.
+        """
+        with self._lock:
+            conn = self._connection()
+            return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+    def _cached(self, key: str, compute: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Return compute(conn) for key, reusing the last result until the change token moves.
+        """
+        token = self.change_token()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == token:
+            return entry[1]
+        with self._lock:
+            value = compute(self._connection())
+        self._cache[key] = (token, value)
+        return value
+
+    def _compute_database_stats(self, conn: sqlite3.Connection) -> dict:
+        # Every count in one scan of the table
+        total_records, unique_cities, feels_like_records = conn.execute(f"""
+            SELECT COUNT(*), COUNT(DISTINCT name), COUNT(feels_like)
+            FROM {self.table_name}
+        """).fetchone()
+        return {
+            'total_records': total_records,
+            'unique_cities': unique_cities,
+            'feels_like_records': feels_like_records,
+            'completeness_percentage': (feels_like_records / total_records * 100) if total_records > 0 else 0
+        }
+
     def get_database_stats(self) -> dict:
+        """
+        Record, city and feels_like counts for static_data, recomputed only after the data changes.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            total_query = f"SELECT COUNT(*) as total_records FROM {self.table_name}"
-            total_df = pd.read_sql_query(total_query, conn)
-            total_records = total_df.iloc[0]['total_records'] if not total_df.empty else 0
-            cities_query = f"SELECT COUNT(DISTINCT name) as unique_cities FROM {self.table_name} WHERE name IS NOT NULL"
-            cities_df = pd.read_sql_query(cities_query, conn)
-            unique_cities = cities_df.iloc[0]['unique_cities'] if not cities_df.empty else 0
-            feels_like_query = f"SELECT COUNT(*) as feels_like_records FROM {self.table_name} WHERE feels_like IS NOT NULL"
-            feels_like_df = pd.read_sql_query(feels_like_query, conn)
-            feels_like_records = feels_like_df.iloc[0]['feels_like_records'] if not feels_like_df.empty else 0
-            conn.close()
-            stats = {
-                'total_records': total_records,
-                'unique_cities': unique_cities,
-                'feels_like_records': feels_like_records,
-                'completeness_percentage': (feels_like_records / total_records * 100) if total_records > 0 else 0
-            }
+            stats = dict(self._cached("database_stats", self._compute_database_stats))
             print(f"[DEBUG] Database stats: {stats}")
             return stats
         except Exception as e:
@@ -126,9 +275,17 @@ class StaticDataQuery:
                 'completeness_percentage': 0
             }
 
+    def close(self):
+        """Close the shared read connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._cache.clear()
+
     def test_connection(self) -> bool:
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite_profile.connect(self.db_path, read_only=True)
             cursor = conn.cursor()
             cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{self.table_name}';")
             table_exists = cursor.fetchone() is not None
@@ -0,0 +1,186 @@
+"""
+Write-behind queue for database inserts.
+Producers hand records to a bounded in-memory queue and return at once;
+a single writer thread drains it and writes records in batches, so disk
+latency stays off the caller's path. When the queue is full, producers
+block until the writer catches up (backpressure) instead of growing memory.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Bounded queue drained by one background writer thread"""
+
+    def __init__(self, write_batch: Callable[[List[Any]], Any], max_size: int = 1000,
+                 batch_size: int = 100, name: str = "write-behind"):
+        """
+        Args:
+            write_batch (callable): Persists a list of records in one transaction;
+                may return the number of records actually written
+            max_size (int): Records held in memory before put() blocks
+            batch_size (int): Max records handed to write_batch at once
+            name (str): Writer thread name
+        """
+        if max_size <= 0 or batch_size <= 0:
+            raise ValueError("max_size and batch_size must be positive")
+        self._write_batch = write_batch
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_size)
+
+        # Records accepted but not yet written (queued + in the current batch)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._closed = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.blocked_puts = 0
+        self.total_commit_time = 0.0
+        self.max_commit_time = 0.0
+        self.last_commit_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, record: Any, timeout: Optional[float] = None) -> None:
+        """
+        Queue a record for writing, blocking while the queue is full.
+
+        Raises:
+            queue.Full: If timeout expires before space frees up
+            RuntimeError: If the queue has been closed
+        """
+        # Checked under the same lock close() takes, so no put can slip in once closing starts
+        with self._idle:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self._pending += 1
+        try:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.blocked_puts += 1
+                self._queue.put(record, timeout=timeout)
+        except BaseException:
+            self._done(1)
+            raise
+        with self._idle:
+            self.enqueued += 1
+
+    def _done(self, count: int) -> None:
+        with self._idle:
+            self._pending -= count
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            start = time.perf_counter()
+            try:
+                saved = self._write_batch(batch)
+                # write_batch may return how many records it kept (the rest were rejected)
+                saved = len(batch) if saved is None else saved
+                self.written += saved
+                self.failed += len(batch) - saved
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"[ERROR] Background write of {len(batch)} records failed: {e}")
+            elapsed = time.perf_counter() - start
+            self.batches += 1
+            self.last_commit_time = elapsed
+            self.total_commit_time += elapsed
+            self.max_commit_time = max(self.max_commit_time, elapsed)
+            self._done(len(batch))
+            if stop:
+                return
+
+    def pending(self) -> int:
+        """Records accepted but not yet written"""
+        with self._idle:
+            return self._pending
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every record queued so far has been written (or failed).
+
+        Returns:
+            bool: True if the queue drained, False if timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting records, write everything still queued and stop the writer.
+
+        Returns:
+            bool: True if all records were flushed before the writer stopped
+        """
+        with self._idle:
+            if self._closed:
+                return self._pending == 0
+            self._closed = True
+        drained = self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # A put still blocked on a full queue when flush() timed out can land
+            # behind _STOP; nothing will write it, so count it as failed
+            dropped = 0
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    dropped += 1
+            if dropped:
+                self.failed += dropped
+                self._done(dropped)
+                print(f"[ERROR] {dropped} queued records were not written before the writer stopped")
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'depth': self._queue.qsize(),
+            'max_size': self._queue.maxsize,
+            'pending': self.pending(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'failed': self.failed,
+            'batches': self.batches,
+            'blocked_puts': self.blocked_puts,
+            'last_commit_ms': round(self.last_commit_time * 1000, 3),
+            'avg_commit_ms': round(self.total_commit_time / self.batches * 1000, 3) if self.batches else 0.0,
+            'max_commit_ms': round(self.max_commit_time * 1000, 3),
+        }
@@ -2,6 +2,7 @@
 This tab allows users to compare weather data between two cities using a static database.
 Users select two cities from dropdowns and view a side-by-side comparison of all available weather fields.
 The system automatically selects the record with the most complete data for each city.
+In matrix mode, any number of cities are compared at once in a single colour-coded table.
 """
 
 import customtkinter as ctk
@@ -10,6 +11,9 @@ import os
 from dotenv import load_dotenv
 from typing import Optional
 from src.DataProcessing.static_data_query import StaticDataQuery
+from src.DataProcessing.comparison_matrix import (
+    FIELD_LABELS, RANKED_FIELDS, ComparisonMatrix, build_matrix
+)
 
 class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
     def __init__(self, parent, controller=None):
@@ -29,9 +33,9 @@ class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
         # Available cities list
         self.available_cities = []
 
-        # GUI components
+        # GUI components; cities are loaded when the tab is first selected
         self.setup_ui()
-        self.load_available_cities() 
+
     def setup_ui(self):
         """Set up the user interface components"""
         # Main container
@@ -46,6 +50,15 @@ class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
         )
         self.header.pack(pady=(0, 20))
 
+        # Mode switch: two-city side-by-side or multi-city matrix
+        self.mode_selector = ctk.CTkSegmentedButton(
+            self.main_frame,
+            values=["Two Cities", "Matrix"],
+            command=self.set_mode
+        )
+        self.mode_selector.set("Two Cities")
+        self.mode_selector.pack(pady=(0, 10))
+
         # City selection frame
         self.selection_frame = ctk.CTkFrame(self.main_frame)
         self.selection_frame.pack(fill="x", padx=20, pady=(0, 20))
@@ -91,6 +104,46 @@ class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
         )
         self.compare_button.grid(row=2, column=0, columnspan=2, pady=20)
 
+        # Matrix mode selection frame (shown instead of selection_frame)
+        self.matrix_frame = ctk.CTkFrame(self.main_frame)
+
+        self.matrix_cities_label = ctk.CTkLabel(
+            self.matrix_frame,
+            text="Cities (comma separated, blank for all):",
+            font=("Segoe UI", 14, "bold")
+        )
+        self.matrix_cities_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
+
+        self.matrix_cities_entry = ctk.CTkEntry(
+            self.matrix_frame,
+            placeholder_text="e.g. Miami, Tampa, Orlando",
+            width=350
+        )
+        self.matrix_cities_entry.grid(row=0, column=1, padx=10, pady=10)
+
+        self.sort_label = ctk.CTkLabel(
+            self.matrix_frame,
+            text="Rank by:",
+            font=("Segoe UI", 14, "bold")
+        )
+        self.sort_label.grid(row=1, column=0, padx=10, pady=10, sticky="w")
+
+        self.sort_dropdown = ctk.CTkComboBox(
+            self.matrix_frame,
+            values=[FIELD_LABELS[field] for field in RANKED_FIELDS],
+            state="readonly",
+            width=200
+        )
+        self.sort_dropdown.set(FIELD_LABELS['temp'])
+        self.sort_dropdown.grid(row=1, column=1, padx=10, pady=10, sticky="w")
+
+        self.matrix_button = ctk.CTkButton(
+            self.matrix_frame,
+            text="Build Matrix",
+            command=self.compare_matrix
+        )
+        self.matrix_button.grid(row=2, column=0, columnspan=2, pady=20)
+
         # Results frame
         self.results_frame = ctk.CTkFrame(self.main_frame)
         self.results_frame.pack(fill="both", expand=True, padx=20)
@@ -104,12 +157,27 @@ class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
         )
         self.status_label.pack(pady=20)
 
+    def set_mode(self, mode: str):
+        """Swap the selection controls between two-city and matrix mode"""
+        if mode == "Matrix":
+            self.selection_frame.pack_forget()
+            self.matrix_frame.pack(fill="x", padx=20, pady=(0, 20), before=self.results_frame)
+        else:
+            self.matrix_frame.pack_forget()
+            self.selection_frame.pack(fill="x", padx=20, pady=(0, 20), before=self.results_frame)
+        self.clear_results()
+
     def on_tab_selected(self):
-        """Called when this tab is clicked/selected - loads cities if not already loaded"""
+        """Called when this tab is clicked/selected - loads cities, refreshing them if the data changed"""
         print("[DEBUG] Group Cities Comparison tab selected")
         if not self.has_loaded_once:
             self.load_available_cities()
             self.has_loaded_once = True
+        else:
+            # Cheap: the city list is cached until static_data changes
+            cities = self.static_data_query.get_all_cities()
+            if cities != self.available_cities:
+                self.load_available_cities()
 
     def load_available_cities(self):
         """Load available cities from the static database"""
@@ -187,6 +255,81 @@ class GroupCitiesComparisonTab(ctk.CTkScrollableFrame):
             self.show_error(f"Error during comparison: {str(e)}")
             print(f"[DEBUG] Error during comparison: {e}")
 
+    def compare_matrix(self):
+        """Compare every requested city (or all cities) in one matrix"""
+        requested = [city.strip() for city in self.matrix_cities_entry.get().split(",") if city.strip()]
+        cities = requested or list(self.available_cities)
+        unknown = [city for city in cities if city not in self.available_cities]
+        cities = [city for city in cities if city in self.available_cities]
+        if len(cities) < 2:
+            self.show_error("Please enter at least two cities from the database")
+            return
+
+        sort_label = self.sort_dropdown.get()
+        sort_by = next((field for field in RANKED_FIELDS if FIELD_LABELS[field] == sort_label), 'temp')
+        print(f"[DEBUG] Building comparison matrix for {len(cities)} cities, ranked by {sort_by}")
+
+        try:
+            records = self.static_data_query.get_best_records(cities)
+            matrix = build_matrix(records, self.unit_symbol, sort_by=sort_by)
+            self.display_matrix(matrix, sort_by, unknown)
+        except Exception as e:
+            self.show_error(f"Error during comparison: {str(e)}")
+            print(f"[DEBUG] Error building comparison matrix: {e}")
+
+    def display_matrix(self, matrix: ComparisonMatrix, sort_by: str, unknown: Optional[list] = None):
+        """
+        Render the matrix as one read-only text widget with a colour tag per cell,
+        instead of one label widget per cell, so dozens of cities stay responsive.
+        """
+        self.clear_results()
+
+        header = ctk.CTkLabel(
+            self.results_frame,
+            text=f"Weather Comparison: {len(matrix.text)} cities ranked by {FIELD_LABELS[sort_by]}",
+            font=("Segoe UI", 16, "bold")
+        )
+        header.pack(pady=(0, 10))
+
+        if unknown:
+            ctk.CTkLabel(
+                self.results_frame,
+                text=f"Not in database: {', '.join(unknown)}",
+                font=("Segoe UI", 12),
+                text_color="orange"
+            ).pack(pady=(0, 10))
+
+        fields = list(matrix.text.columns)
+        city_width = max([len("City")] + [len(str(city)) for city in matrix.text.index]) + 2
+        widths = {
+            field: max(len(FIELD_LABELS[field]), int(matrix.text[field].str.len().max() or 0)) + 2
+            for field in fields
+        }
+        ranks = matrix.ranks[sort_by]
+
+        table = ctk.CTkTextbox(
+            self.results_frame,
+            font=("Courier New", 12),
+            wrap="none",
+            height=min(600, 40 + 20 * len(matrix.text))
+        )
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+        for color in pd.unique(matrix.colors.to_numpy().ravel()):
+            table.tag_config(color, foreground=color)
+
+        table.insert("end", "#".ljust(5) + "City".ljust(city_width)
+                     + "".join(FIELD_LABELS[field].ljust(widths[field]) for field in fields) + "\n")
+        for city, text_row, color_row, rank in zip(
+            matrix.text.index, matrix.text.itertuples(index=False),
+            matrix.colors.itertuples(index=False), ranks
+        ):
+            rank_text = "-" if pd.isna(rank) else str(int(rank))
+            table.insert("end", rank_text.ljust(5) + str(city).ljust(city_width))
+            for field, text, color in zip(fields, text_row, color_row):
+                table.insert("end", text.ljust(widths[field]), color)
+            table.insert("end", "\n")
+        table.configure(state="disabled")
+
     def clear_results(self):
         """Clear all widgets from results frame except status label"""
         for widget in self.results_frame.winfo_children():
@@ -61,6 +61,9 @@ class RootWindow(ctk.CTk):
         if current_tab == "Weather Alerts":
             # Trigger alerts refresh when alerts tab is selected
             self.alerts_tab.on_tab_selected()
+        elif current_tab == "Group Cities Comparison":
+            # Load (or refresh) the city dropdowns on first view instead of at startup
+            self.group_cities_comparison_tab.on_tab_selected()
 
 if __name__ == "__main__":
     app = RootWindow()
@@ -1,10 +1,10 @@
 import customtkinter as ctk
-import sqlite3
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for embedding
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from src.DataProcessing import sqlite_profile
 
 class RecentAPICallsTab(ctk.CTkScrollableFrame):
     def __init__(self, parent):
@@ -54,11 +54,11 @@ class RecentAPICallsTab(ctk.CTkScrollableFrame):
 
         try:
             # Connect and query last three rows
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite_profile.connect(self.db_path, read_only=True)
             query = """
-                SELECT dt, name, temp, humidity, feels_like
+                SELECT dt_epoch, name, temp, humidity, feels_like
                 FROM weather
-                ORDER BY datetime(dt) DESC
+                ORDER BY dt_epoch DESC
                 LIMIT 3
             """
             df = pd.read_sql_query(query, conn)
@@ -73,6 +73,8 @@ class RecentAPICallsTab(ctk.CTkScrollableFrame):
 
             # Reverse to chronological order (oldest first)
             df = df.iloc[::-1].reset_index(drop=True)
+            # Integer epoch seconds convert to timestamps without string parsing
+            df['dt'] = pd.to_datetime(df['dt_epoch'], unit='s')
 
             # Prepare plot
             fig, ax = plt.subplots(figsize=(6, 4))
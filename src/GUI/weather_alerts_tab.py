@@ -15,8 +15,7 @@ the alerts should be little buttons or labels that pop up and display the alert
 """
 
 import customtkinter as ctk
-from src.DataProcessing.data_query import fetch_last_data_entry
-import sqlite3
+from src.DataProcessing.data_query import WeatherRecord, fetch_most_recent_entry
 import pandas as pd
 import os
 from dotenv import load_dotenv
@@ -67,42 +66,20 @@ class WeatherAlertsTab(ctk.CTkScrollableFrame):
         print("[DEBUG] Refreshing alerts...")
         self.display_alerts()
 
-    def fetch_most_recent_entry_for_last_city(self, db_path: str = "Data/weather_data.db") -> Optional[pd.Series]:
+    def fetch_most_recent_entry_for_last_city(self, db_path: str = "Data/weather_data.db") -> Optional[WeatherRecord]:
         """
         Fetch the most recent weather entry for the last searched city from the SQLite database.
         
         Returns:
-            pd.Series: The most recent row for the last searched city, or None if not found.
+            WeatherRecord: The most recent row for the last searched city, or None if not found.
         """
-        try:
-            conn = sqlite3.connect(db_path)
-            
-            # First, get the most recent city that was searched
-            recent_city_query = """
-                SELECT name FROM weather
-                ORDER BY dt DESC
-                LIMIT 1
-            """
-            recent_city_df = pd.read_sql_query(recent_city_query, conn)
-            
-            if recent_city_df.empty:
-                conn.close()
-                return None
-                
-            last_city = recent_city_df.iloc[0]['name']
-            print(f"[DEBUG] Last searched city: {last_city}")
-            
-            # Close this connection before calling fetch_last_data_entry
-            conn.close()
-            
-            # Now get the most recent data for that city using the existing function
-            data = fetch_last_data_entry(last_city, db_path)
-            
-            return data
-            
-        except Exception as e:
-            print(f"Error fetching most recent data for last city: {e}")
-            return None
+        # Newest row across all cities: from the controller's database cache when
+        # available, otherwise one query on the per-city latest_weather table
+        db = getattr(self.controller, "db", None)
+        data = db.get_most_recent() if db is not None else fetch_most_recent_entry(db_path)
+        if data is not None:
+            print(f"[DEBUG] Last searched city: {data['name']}")
+        return data
 
     def display_alerts(self):
         print("[DEBUG] display_alerts() called")
@@ -132,7 +109,7 @@ class WeatherAlertsTab(ctk.CTkScrollableFrame):
         self.status_label.destroy()
         self.alert_labels.remove(self.status_label)
         
-        if data is None or data.empty:
+        if data is None:
             no_data = ctk.CTkLabel(
                 self.alerts_frame,
                 text="No weather data available in database. Search for a city first.",
@@ -143,7 +120,7 @@ class WeatherAlertsTab(ctk.CTkScrollableFrame):
             self.alert_labels.append(no_data)
             return
 
-        # Extract fields from database row (pandas Series)
+        # Extract fields from database row (WeatherRecord)
         city_name = data.get("name", "Unknown")
         feels_like = data.get("feels_like")
         wind_speed = data.get("speed")  # Database uses 'speed' column
@@ -69,8 +69,9 @@ if SRC_PATH not in sys.path:
     sys.path.append(SRC_PATH)
 
 # ✅ 2. Local imports (after sys.path adjustment)
-from DataProcessing.data_query import fetch_last_data_entry
+import requests
 from src.API.API_call import WeatherAPI
+from src.API.resilience import is_upstream_failure
 from src.DataProcessing.data_to_SQL import WeatherDB
 from src.GUI.root_window import RootWindow
 from src.ErrorHandling.error_handling_entry import CityNameHandler
@@ -86,12 +87,28 @@ class WeatherAppController:
         print("Welcome to the WeatherFirst!")
 
         # Instantiate dependencies
-        self.db = WeatherDB()
+        # Large databases finish their schema upgrade in the background; progress shows in the title bar
+        self.migration_message = ""
+        self.db = WeatherDB(migration_progress=self._on_migration_progress)
         self.api = WeatherAPI()
         self.gui = RootWindow(controller=self)
         self.alerts_tab = None  # set by RootWindow after initialization
+        self._show_migration_status()
         print("Controller initialized successfully.")
 
+    def _on_migration_progress(self, message):
+        """Database upgrade progress; called from the migration thread, so only store it"""
+        print(f"[INFO] {message}")
+        self.migration_message = message
+
+    def _show_migration_status(self, poll_ms=500):
+        """Mirror the background database upgrade in the window title until it finishes"""
+        if self.db.migrating():
+            self.gui.title(f"WeatherFirst - upgrading database: {self.migration_message}")
+            self.gui.after(poll_ms, self._show_migration_status, poll_ms)
+        else:
+            self.gui.title("WeatherFirst")
+
     
 
     def fetch_and_store_weather(self, city):
@@ -106,22 +123,84 @@ class WeatherAppController:
 
         print(f"Fetching weather for {norm_city}...")
 
-        data = self.api.get_weather_data(norm_city)
+        try:
+            data = self.api.get_weather_data(norm_city)
+        except requests.exceptions.RequestException as err:
+            if not is_upstream_failure(err):
+                raise
+            # API is down: fall back to the last observation stored for this city
+            stored = self.db.get_latest(norm_city)
+            if stored is None:
+                raise
+            print(f"[WARN] OpenWeatherMap unavailable; showing stored weather for {norm_city} from {stored.dt}")
+            return self._stored_row_to_weather_data(stored)
+
+        if data and data.get("_stale"):
+            # Served from cache during an outage; it is already stored
+            return data
 
         if data and "main" in data and "weather" in data:
-        # Fix: Use the correct method name
-            self.db.save_weather_to_sqlite(data)  # Instead of self.db.save(data)
-            print(f"Weather for {norm_city} saved to database.")
+            # Written by the database's background writer so the GUI gets the data without waiting on disk
+            self.db.enqueue(data)
+            print(f"Weather for {norm_city} queued for saving.")
 
-        # After successfully fetching, refresh alerts tab if available
+        # Once the write lands, refresh alerts tab if available
             if hasattr(self, 'alerts_tab') and self.alerts_tab:
-                self.alerts_tab.refresh_alerts()
+                self._refresh_alerts_after_write()
             return data 
     
         else:
             print(f"Failed to fetch weather data for {norm_city}.")
             return None
 
+    def _refresh_alerts_after_write(self, poll_ms=50):
+        """
+        Refresh the alerts tab once the background writer has committed the
+        queued records. Polls from the Tk event loop so the GUI is only touched
+        from its own thread.
+        """
+        if self.db.pending_writes():
+            self.gui.after(poll_ms, self._refresh_alerts_after_write, poll_ms)
+        else:
+            self.alerts_tab.refresh_alerts()
+
+    def fetch_and_store_many(self, cities):
+        """
+        Fetch a list of cities in bulk and store them in one database transaction.
+
+        Returns:
+            list: Per-city results from WeatherAPI.get_weather_data_bulk
+        """
+        valid = []
+        for city in cities:
+            norm_city = CityNameHandler.normalize_city_name(city)
+            if CityNameHandler.validate_city_name(norm_city):
+                valid.append(norm_city)
+            else:
+                print(f"Invalid city name: {city}")
+
+        results = self.api.get_weather_data_bulk(valid)
+        fresh = [r["data"] for r in results if r["data"] is not None and not r["data"].get("_stale")]
+        self.db.save_many(fresh)
+        return results
+
+    def _stored_row_to_weather_data(self, row):
+        """
+        Rebuild an OpenWeatherMap-shaped dict from a stored WeatherRecord so the GUI can display it.
+        """
+        return {
+            "name": row.name,
+            "main": {
+                "temp": row.temp,
+                "feels_like": row.feels_like,
+                "humidity": row.humidity,
+            },
+            "weather": [{"description": row.description or "N/A"}],
+            "wind": {"speed": row.speed},
+            "_unit_info": {"symbol": self.api.unit_symbol, "system": self.api.units},
+            "_stale": True,
+        }
+
     def get_last_weather_data(self):
         """
         Return the most recent weather data entry from the database.
@@ -131,13 +210,17 @@ class WeatherAppController:
             city = self.dashboard_tab.city_entry.get().strip()
         if not city:
             city = "Charleston"  # fallback default if empty
-        return fetch_last_data_entry(city)
+        return self.db.get_latest(city)
 
     def run(self):
         """
         Start the GUI loop.
         """
-        self.gui.mainloop()
+        try:
+            self.gui.mainloop()
+        finally:
+            self.api.close()
+            self.db.close()
 
 
 # ✅ 3. Only launch the app when this file is run directly